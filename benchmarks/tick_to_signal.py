@@ -0,0 +1,165 @@
+"""
+End-to-end tick-to-signal benchmark against the local stand-in server.
+
+For every asset count, a stand-in server (`eopr.testing.server`) is started in its
+own process and an `eopr.aio` reader subscribes to all of its assets. Frames go
+through `FrameDispatcher`, `AssetRouter` and one `CrossoverState` per asset, and the
+benchmark reports the frames handled per second, the p50/p99 latency from the server
+sending a tick to its `TradeSignal` being computed, and the reader's RSS.
+
+    python benchmarks/tick_to_signal.py --assets 1 10 100 500 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import typing
+
+from eopr import aio
+from eopr.core.strategies.macd_rsi_crossover import CrossoverState
+from eopr.utils.asset_router import AssetRouter
+from eopr.utils.frame_decoder import CandlesFrame, FrameDispatcher
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS.
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def wait_for_port(host: str, port: int, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+async def measure(
+    url: str, assets: int, duration: float, warmup: float
+) -> dict[str, typing.Any]:
+    latencies: list[float] = []
+    frames = 0
+    measuring = False
+
+    def on_candles(ws: typing.Any, frame: CandlesFrame, state: CrossoverState) -> None:
+        nonlocal frames
+        tick = frame.candles[0]
+        bar = frame.candles[-1]
+        state.update(bar.t, bar.close)
+        if measuring:
+            latencies.append(time.time() - tick.t)
+            frames += 1
+
+    router = AssetRouter(lambda asset_id: CrossoverState(), default=on_candles)
+    dispatcher = FrameDispatcher()
+    dispatcher.on("candles", router)
+
+    reader = asyncio.create_task(
+        aio.read(
+            aio.AsyncReaderParams(
+                url=url,
+                token="benchmark",
+                device_token="benchmark",
+                asset_ids=set(range(1, assets + 1)),
+                on_message_strategy=dispatcher,
+            )
+        )
+    )
+    await asyncio.sleep(warmup)
+    measuring = True
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    measuring = False
+    elapsed = time.perf_counter() - start
+    reader.cancel()
+    try:
+        await reader
+    except asyncio.CancelledError:
+        pass
+
+    return {
+        "assets": assets,
+        "frames_per_second": frames / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rss_mb": rss_mb(),
+    }
+
+
+def run(args: argparse.Namespace, assets: int) -> dict[str, typing.Any]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "eopr.testing.server",
+            "--host",
+            args.host,
+            "--port",
+            str(args.port),
+            "--assets",
+            str(assets),
+            "--rate",
+            str(args.rate),
+        ]
+    )
+    try:
+        wait_for_port(args.host, args.port)
+        return asyncio.run(
+            measure(f"ws://{args.host}:{args.port}", assets, args.duration, args.warmup)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tick-to-signal benchmark.")
+    parser.add_argument("--assets", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--rate", type=float, default=2, help="frames/asset/second")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(
+            f"{'assets':>8} {'frames/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8}"
+        )
+    for assets in args.assets:
+        result = run(args, assets)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{result['assets']:>8} {result['frames_per_second']:>10.1f} "
+                f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['rss_mb']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,35 @@
 import datetime
 import json
+import time
 import typing
 
 import pydantic
 from websocket._app import WebSocketApp
 
+from eopr import metrics
+from eopr.ns import check_handshake
+
 
 def on_message(
     ws: WebSocketApp,
     message: bytes,
     strategy_handler: typing.Callable[[WebSocketApp, typing.Any], typing.Any],
 ) -> None:
-    strategy_handler(ws, message)
+    if not metrics.enabled:
+        strategy_handler(ws, message)
+        return
+
+    started = time.perf_counter()
+    metrics.FRAMES.labels().inc()
+    try:
+        strategy_handler(ws, message)
+    finally:
+        metrics.observe("frame", started)
 
 
 def on_error(ws: WebSocketApp, error: str) -> None:
+    if metrics.enabled:
+        metrics.ERRORS.labels().inc()
     print(f"Error: {error}")
 
 
@@ -22,8 +37,51 @@ def on_close(ws: WebSocketApp, close_status_code: str, close_msg: str) -> None:
     print(f"Closed: {close_msg=}, {close_status_code=}")
 
 
-def on_open(ws: WebSocketApp, token: str, device_token: str, asset_id: int) -> None:
-    messages: typing.Any = [
+def history_message(
+    token: str, asset_id: int, period: tuple[int, int], timeframe: int, ns: int
+) -> dict[str, typing.Any]:
+    return {
+        "action": "assetHistoryCandles",
+        "message": {
+            "assetid": asset_id,
+            "periods": [list(period)],
+            "timeframes": [timeframe],
+        },
+        "token": token,
+        "ns": ns,
+    }
+
+
+def asset_messages(
+    token: str, asset_ids: typing.Iterable[int], ns: int
+) -> list[dict[str, typing.Any]]:
+    """History and candle subscription requests for every asset, numbered from `ns`."""
+    asset_ids = list(asset_ids)
+    check_handshake(ns + len(asset_ids))
+    now = int(datetime.datetime.now().timestamp())
+    messages = [
+        history_message(token, asset_id, (now, now + 5400), 5, ns + i)
+        for i, asset_id in enumerate(asset_ids)
+    ]
+    messages.append(
+        {
+            "action": "subscribeCandles",
+            "message": {"assetsIds": asset_ids},
+            "token": token,
+            "ns": ns + len(asset_ids),
+        }
+    )
+
+    return messages
+
+
+def handshake_messages(
+    token: str, device_token: str, asset_ids: int | typing.Iterable[int]
+) -> list[dict[str, typing.Any]]:
+    if isinstance(asset_ids, int):
+        asset_ids = [asset_ids]
+
+    return [
         {
             "action": "setContext",
             "message": {"is_demo": 1},
@@ -151,50 +209,119 @@ def on_open(ws: WebSocketApp, token: str, device_token: str, asset_id: int) -> N
             "token": token,
             "ns": 7,
         },
-        {
-            "action": "assetHistoryCandles",
-            "message": {
-                "assetid": asset_id,
-                "periods": [
-                    [
-                        int(datetime.datetime.now().timestamp()),
-                        int(datetime.datetime.now().timestamp()) + 5400,
-                    ]
-                ],
-                "timeframes": [5],
-            },
-            "token": token,
-            "ns": 8,
-        },
+        *asset_messages(token, asset_ids, 8),
     ]
 
-    for message in messages:
+
+def on_open(
+    ws: WebSocketApp,
+    token: str,
+    device_token: str,
+    asset_ids: int | typing.Iterable[int],
+) -> None:
+    for message in handshake_messages(token, device_token, asset_ids):
         ws.send(json.dumps(message))
 
 
 class ReaderParams(pydantic.BaseModel):
+    """Reader settings.
+
+    Candles are requested for `asset_id` and every id in `asset_ids`, all over the
+    same connection. When `record_path` is set, every received frame is appended to
+    that recording (see `eopr.recorder`). With `resume`, reconnects send a minimal
+    handshake, refill only the history missed while disconnected and back off
+    exponentially (see `eopr.session`) instead of waiting a fixed 5 seconds.
+    """
+
     url: str
     token: str
     device_token: str
-    asset_id: int
+    asset_id: int | None = None
+    asset_ids: set[int] = pydantic.Field(default_factory=set)
     on_message_strategy: typing.Callable[[WebSocketApp, bytes], typing.Any]
+    record_path: str | None = None
+    resume: bool = False
+
+    @pydantic.model_validator(mode="after")
+    def _check_assets(self) -> typing.Self:
+        if not self.assets:
+            raise ValueError("either asset_id or asset_ids must be given")
+
+        return self
+
+    @property
+    def assets(self) -> list[int]:
+        assets = set(self.asset_ids)
+        if self.asset_id is not None:
+            assets.add(self.asset_id)
+
+        return sorted(assets)
 
 
 def read(
     main_args: ReaderParams,
 ) -> None:
+    connections = 0
+    session = None
+    if main_args.resume:
+        from eopr.session import Session
+
+        session = Session(main_args.token, main_args.device_token, main_args.assets)
+
     def _on_open(ws: WebSocketApp) -> None:
-        return on_open(ws, main_args.token, main_args.device_token, main_args.asset_id)
+        nonlocal connections
+        connections += 1
+        if connections > 1 and metrics.enabled:
+            metrics.RECONNECTS.labels().inc()
+        if session is not None:
+            for message in session.open_messages():
+                ws.send(json.dumps(message))
+            return
+        return on_open(ws, main_args.token, main_args.device_token, main_args.assets)
+
+    recorder = None
+    if main_args.record_path is not None:
+        from eopr.recorder import FrameRecorder
+
+        recorder = FrameRecorder(main_args.record_path)
 
     def _on_message(ws: WebSocketApp, message: bytes) -> None:
+        if recorder is not None:
+            recorder.write(message)
+        if session is not None:
+            session.observe(message)
         return on_message(ws, message, main_args.on_message_strategy)
 
+    def _on_error(ws: WebSocketApp, error: typing.Any) -> None:
+        if session is not None:
+            session.on_error(error)
+        return on_error(ws, error)
+
     ws = WebSocketApp(
         main_args.url,
         on_open=_on_open,
         on_message=_on_message,
-        on_error=on_error,
+        on_error=_on_error,
         on_close=on_close,
     )
+    if session is not None:
+        close = ws.close
+
+        def _close(**kwargs: typing.Any) -> None:
+            # Closed by the caller, not dropped: do not reconnect.
+            session.stop()
+            close(**kwargs)
+
+        ws.close = _close  # type: ignore
 
-    ws.run_forever(reconnect=5)  # type: ignore
+    try:
+        if session is None:
+            ws.run_forever(reconnect=5)  # type: ignore
+        else:
+            while not session.stopped:
+                ws.run_forever()
+                if not session.stopped:
+                    time.sleep(session.backoff.next())
+    finally:
+        if recorder is not None:
+            recorder.close()
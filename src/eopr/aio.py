@@ -0,0 +1,141 @@
+"""
+eopr.aio
+~~~~~~~~
+
+asyncio counterpart of `eopr.read`. Every session is a coroutine on the running event
+loop instead of a blocking `WebSocketApp` with its own threads, so many accounts or
+tokens can share one process:
+
+    await read_many([AsyncReaderParams(...), AsyncReaderParams(...)])
+
+Strategy handlers get the asyncio connection (whose `send` is a coroutine) and the raw
+frame, and may be either plain functions or coroutines.
+"""
+
+import asyncio
+import inspect
+import json
+import time
+import typing
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed, WebSocketException
+
+from eopr import ReaderParams, handshake_messages, metrics
+from eopr.recorder import FrameRecorder
+
+AsyncStrategyHandler = typing.Callable[[ClientConnection, bytes | str], typing.Any]
+
+
+async def on_message(
+    ws: ClientConnection,
+    message: bytes | str,
+    strategy_handler: AsyncStrategyHandler,
+) -> None:
+    if not metrics.enabled:
+        result = strategy_handler(ws, message)
+        if inspect.isawaitable(result):
+            await result
+        return
+
+    started = time.perf_counter()
+    metrics.FRAMES.labels().inc()
+    try:
+        result = strategy_handler(ws, message)
+        if inspect.isawaitable(result):
+            await result
+    finally:
+        metrics.observe("frame", started)
+
+
+def on_error(ws: ClientConnection | None, error: Exception) -> None:
+    if metrics.enabled:
+        metrics.ERRORS.labels().inc()
+    print(f"Error: {error}")
+
+
+def on_close(
+    ws: ClientConnection, close_status_code: int | None, close_msg: str
+) -> None:
+    print(f"Closed: {close_msg=}, {close_status_code=}")
+
+
+async def on_open(
+    ws: ClientConnection,
+    token: str,
+    device_token: str,
+    asset_ids: int | typing.Iterable[int],
+) -> None:
+    for message in handshake_messages(token, device_token, asset_ids):
+        await ws.send(json.dumps(message))
+
+
+class AsyncReaderParams(ReaderParams):
+    on_message_strategy: AsyncStrategyHandler  # type: ignore
+    reconnect: float = 5
+
+
+async def read(main_args: AsyncReaderParams) -> None:
+    """Read from the server until cancelled, reconnecting like `eopr.read` does."""
+    recorder = None
+    if main_args.record_path is not None:
+        recorder = FrameRecorder(main_args.record_path)
+
+    session = None
+    if main_args.resume:
+        from eopr.session import Session
+
+        session = Session(main_args.token, main_args.device_token, main_args.assets)
+
+    try:
+        connections = 0
+        while True:
+            try:
+                async with connect(main_args.url, max_size=None) as ws:
+                    connections += 1
+                    if connections > 1 and metrics.enabled:
+                        metrics.RECONNECTS.labels().inc()
+                    if session is None:
+                        await on_open(
+                            ws,
+                            main_args.token,
+                            main_args.device_token,
+                            main_args.assets,
+                        )
+                    else:
+                        for resume_message in session.open_messages():
+                            await ws.send(json.dumps(resume_message))
+                    try:
+                        async for message in ws:
+                            if recorder is not None:
+                                recorder.write(message)
+                            if session is not None:
+                                session.observe(message)
+                            try:
+                                await on_message(
+                                    ws, message, main_args.on_message_strategy
+                                )
+                            except Exception as e:
+                                # Like WebSocketApp, a failing handler does not drop
+                                # the connection.
+                                on_error(ws, e)
+                    except ConnectionClosed:
+                        pass
+                    on_close(ws, ws.close_code, ws.close_reason or "")
+            except (OSError, WebSocketException) as e:
+                on_error(None, e)
+
+            if session is None:
+                await asyncio.sleep(main_args.reconnect)
+            else:
+                await asyncio.sleep(session.backoff.next())
+    finally:
+        if recorder is not None:
+            recorder.close()
+
+
+async def read_many(main_args: typing.Iterable[AsyncReaderParams]) -> None:
+    """Run one `read` per session concurrently on the current event loop."""
+    async with asyncio.TaskGroup() as tasks:
+        for params in main_args:
+            tasks.create_task(read(params))
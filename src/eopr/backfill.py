@@ -0,0 +1,224 @@
+"""
+eopr.backfill
+~~~~~~~~~~~~~
+
+Pipelined historical candle backfill. A long time range is split into chunks, each
+sent as its own `assetHistoryCandles` request tagged with a unique `ns`, with up to
+`max_in_flight` requests outstanding at once. Responses are matched back to their
+request by `ns`, and the chunks of a range are merged into one contiguous,
+de-duplicated candle series:
+
+    backfill = Backfill(ws.send, token)
+    dispatcher.on("assetHistoryCandles", backfill.on_response)
+    candles = backfill.fetch(160, start, end).result()
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import json
+import threading
+import typing
+
+from eopr import errors, history_message
+from eopr.ns import BACKFILL
+from eopr.utils.candle_parser import Candle
+from eopr.utils.frame_decoder import Frame
+
+Send = typing.Callable[[str], typing.Any]
+HistoryParser = typing.Callable[[typing.Any, int], list[Candle]]
+CandlesFuture = concurrent.futures.Future[list[Candle]]
+
+DEFAULT_CHUNK_SECONDS = 3600
+DEFAULT_NS_START = BACKFILL
+
+
+class _Request(typing.NamedTuple):
+    ns: int
+    message: str
+    timeframe: int
+    future: CandlesFuture
+
+
+def chunk_periods(start: int, end: int, chunk_seconds: int) -> list[tuple[int, int]]:
+    """Split [start, end) into consecutive periods of at most `chunk_seconds`."""
+    return [
+        (chunk_start, min(chunk_start + chunk_seconds, end))
+        for chunk_start in range(start, end, chunk_seconds)
+    ]
+
+
+def parse_history_candles(message: typing.Any, timeframe: int) -> list[Candle]:
+    """Parse the candles of an `assetHistoryCandles` response.
+
+    Candles are read from `message["candles"]`, either in the same `{"tf", "t", "v"}`
+    shape as live `candles` frames or as `[t, open, high, low, close]` rows.
+    """
+    candles: list[Candle] = []
+    for candle in message.get("candles", []):
+        if isinstance(candle, dict):
+            values = candle.get("v", [])
+            if len(values) == 4:
+                candles.append(
+                    Candle(candle.get("tf", timeframe), candle["t"], *values)
+                )
+        elif len(candle) == 5:
+            candles.append(Candle(timeframe, *candle))
+
+    return candles
+
+
+def merge_candles(series: typing.Iterable[list[Candle]]) -> list[Candle]:
+    """Merge candle series into one sorted by time, later series winning on overlap."""
+    merged: dict[float, Candle] = {}
+    for candles in series:
+        for candle in candles:
+            merged[candle.t] = candle
+
+    return [merged[t] for t in sorted(merged)]
+
+
+def _gather(futures: list[CandlesFuture]) -> CandlesFuture:
+    result: CandlesFuture = concurrent.futures.Future()
+    remaining = len(futures)
+    lock = threading.Lock()
+
+    def done(_: CandlesFuture) -> None:
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining or result.done():
+                return
+        for future in futures:
+            if future.cancelled():
+                result.cancel()
+                return
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+                return
+        result.set_result(merge_candles(future.result() for future in futures))
+
+    if not futures:
+        result.set_result([])
+    for future in futures:
+        future.add_done_callback(done)
+
+    return result
+
+
+def _fail(future: CandlesFuture, error: Exception) -> None:
+    """Fail `future` unless it is already done, e.g. cancelled by its caller."""
+    try:
+        future.set_exception(error)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+class Backfill:
+    """Keep up to `max_in_flight` history requests outstanding on one connection.
+
+    `on_response` must be registered as the `assetHistoryCandles` handler of the
+    connection's `FrameDispatcher`.
+
+    Args:
+        send (Send): Sends a text frame, e.g. `WebSocketApp.send`.
+        token (str): The session token.
+        max_in_flight (int): How many requests may await a response at once.
+        chunk_seconds (int): The longest period a single request asks for.
+        ns_start (int): The first `ns` given to a request.
+        parser (HistoryParser): Turns a response `message` into candles.
+    """
+
+    def __init__(
+        self,
+        send: Send,
+        token: str,
+        max_in_flight: int = 8,
+        chunk_seconds: int = DEFAULT_CHUNK_SECONDS,
+        ns_start: int = DEFAULT_NS_START,
+        parser: HistoryParser = parse_history_candles,
+    ) -> None:
+        self.send = send
+        self.token = token
+        self.max_in_flight = max_in_flight
+        self.chunk_seconds = chunk_seconds
+        self.parser = parser
+        self._ns = itertools.count(ns_start)
+        self._lock = threading.Lock()
+        self._queue: collections.deque[_Request] = collections.deque()
+        self._in_flight: dict[int, _Request] = {}
+
+    def fetch(
+        self, asset_id: int, start: int, end: int, timeframe: int = 5
+    ) -> CandlesFuture:
+        """Request the candles of `asset_id` between `start` and `end`.
+
+        Returns:
+            CandlesFuture: Resolves to the merged candles once every chunk arrived.
+        """
+        futures: list[CandlesFuture] = []
+        with self._lock:
+            for period in chunk_periods(start, end, self.chunk_seconds):
+                ns = next(self._ns)
+                message = history_message(self.token, asset_id, period, timeframe, ns)
+                future: CandlesFuture = concurrent.futures.Future()
+                self._queue.append(_Request(ns, json.dumps(message), timeframe, future))
+                futures.append(future)
+            ready = self._take_ready()
+
+        self._send(ready)
+        return _gather(futures)
+
+    def on_response(self, ws: typing.Any, frame: Frame) -> None:
+        with self._lock:
+            request = self._in_flight.pop(frame.ns, None) if frame.ns else None
+            if request is None:
+                return
+            ready = self._take_ready()
+
+        try:
+            candles = self.parser(frame.message, request.timeframe)
+        except Exception as e:
+            _fail(request.future, errors.EoprError(e))
+        else:
+            try:
+                request.future.set_result(candles)
+            except concurrent.futures.InvalidStateError:
+                pass
+
+        self._send(ready)
+
+    def cancel(self) -> None:
+        """Fail every queued and in-flight request, e.g. when the connection drops."""
+        with self._lock:
+            requests = [*self._in_flight.values(), *self._queue]
+            self._in_flight.clear()
+            self._queue.clear()
+
+        for request in requests:
+            _fail(
+                request.future, errors.EoprError(ConnectionError("backfill cancelled"))
+            )
+
+    def _take_ready(self) -> list[_Request]:
+        ready: list[_Request] = []
+        while self._queue and len(self._in_flight) < self.max_in_flight:
+            request = self._queue.popleft()
+            self._in_flight[request.ns] = request
+            ready.append(request)
+
+        return ready
+
+    def _send(self, requests: list[_Request]) -> None:
+        """Send requests taken by `_take_ready`; a request that cannot be sent fails
+        and frees its slot for the next queued one."""
+        pending = collections.deque(requests)
+        while pending:
+            request = pending.popleft()
+            try:
+                self.send(request.message)
+            except Exception as e:
+                with self._lock:
+                    self._in_flight.pop(request.ns, None)
+                    pending.extend(self._take_ready())
+                _fail(request.future, errors.EoprError(e))
@@ -0,0 +1,189 @@
+"""
+eopr.core.backtest
+~~~~~~~~~~~~~~~~~~
+
+Offline replay of the MACD RSI crossover strategy over stored candles, e.g. from
+`CandleStore.range` or `CandleBuffer.window`, with binary-option outcomes.
+
+`signals` evaluates the strategy over a whole series in one vectorized pass and
+`replay` streams `TradeSignal`s through the incremental indicators; both give the same
+signals `macd_rsi_crossover.trade` would give live at every candle. `run` turns the
+signals into simulated trades: a buy is a call and a sell a put, struck at the close of
+the signal candle and settled at the last close before `expiry` seconds later. As on
+the server (docs/Trades.md), a winning trade pays `amount * profit / 100`, a losing one
+costs `amount` and a draw is refunded. Candles whose signal has both `buy` and `sell`
+set are not traded.
+"""
+
+import typing
+
+import numpy
+import numpy.typing
+import pydantic
+
+from eopr.core.indicators import vectorized
+from eopr.core.indicators.macd import MACDState
+from eopr.core.indicators.rsi import RSIState
+from eopr.core.signals import CALL, PUT
+from eopr.core.strategies.macd_rsi_crossover import TradeSignal
+from eopr.utils.candle_buffer import CLOSE, TIME
+
+
+class BacktestParameters(pydantic.BaseModel):
+    fast: int = 12
+    slow: int = 26
+    signal: int = 9
+    period: int = 14
+    overbought: float = 70
+    oversold: float = 30
+    timeframe: int = 5
+    expiry: int = 30
+    profit: float = 76
+    amount: float = 100
+
+
+class Trades(typing.NamedTuple):
+    """Simulated trades, one array entry per trade."""
+
+    index: numpy.typing.NDArray[numpy.intp]
+    direction: numpy.typing.NDArray[numpy.int8]
+    strike_time: vectorized.Array
+    strike_rate: vectorized.Array
+    exp_time: vectorized.Array
+    exp_rate: vectorized.Array
+    result_amount: vectorized.Array
+
+
+class BacktestResult(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+
+    trades: Trades
+    wins: int
+    losses: int
+    draws: int
+    win_rate: float
+    pnl: float
+
+
+def signals(
+    closes: numpy.typing.ArrayLike, params: BacktestParameters
+) -> tuple[numpy.typing.NDArray[numpy.bool_], numpy.typing.NDArray[numpy.bool_]]:
+    """Evaluate the strategy at every candle of one or many close series at once.
+
+    Args:
+        closes (ArrayLike): Close prices, along the last axis.
+        params (BacktestParameters): The strategy parameters.
+
+    Returns:
+        tuple: The `buy` and `sell` flags, shaped like `closes`.
+    """
+    close_prices = numpy.asarray(closes, dtype=numpy.float64)
+    macd = vectorized.macd(close_prices, params.fast, params.slow, params.signal)
+    rsi_values = vectorized.rsi(close_prices, params.period)
+
+    cross = numpy.zeros(close_prices.shape, dtype=numpy.bool_)
+    cross[..., 1:] = (macd.macd_line[..., :-1] < macd.signal_line[..., :-1]) & (
+        macd.macd_line[..., 1:] > macd.signal_line[..., 1:]
+    )
+
+    # rsi_values[k] is the RSI as of candle `period + 1 + k`; earlier candles have
+    # no RSI yet and never signal.
+    rsi = numpy.full(close_prices.shape, numpy.nan)
+    rsi[..., params.period + 1 :] = rsi_values
+    buy = cross & (rsi > params.oversold)
+    sell = cross & (rsi < params.overbought)
+
+    return buy, sell
+
+
+def replay(
+    closes: typing.Iterable[float], params: BacktestParameters
+) -> typing.Iterator[tuple[int, TradeSignal]]:
+    """Stream the strategy's signal at every candle through the incremental
+    indicators, like a live reader would."""
+    macd = MACDState(params.fast, params.slow, params.signal)
+    rsi = RSIState(params.period)
+    previous = None
+
+    for i, close in enumerate(closes):
+        point = macd.update(close)
+        rsi_value = rsi.update(close)
+        cross = (
+            previous is not None
+            and previous.macd < previous.signal
+            and point.macd > point.signal
+        )
+        previous = point
+        if rsi_value is None:
+            yield i, TradeSignal.model_construct()
+            continue
+
+        yield i, TradeSignal.model_construct(
+            buy=cross and rsi_value > params.oversold,
+            sell=cross and rsi_value < params.overbought,
+        )
+
+
+def simulate(
+    candles: vectorized.Array,
+    buy: numpy.typing.NDArray[numpy.bool_],
+    sell: numpy.typing.NDArray[numpy.bool_],
+    params: BacktestParameters,
+) -> Trades:
+    """Settle the trades opened by `buy`/`sell` over a (5 x n) candle window."""
+    times = candles[TIME]
+    closes = candles[CLOSE]
+    direction = buy.astype(numpy.int8) - sell.astype(numpy.int8)
+    index = numpy.flatnonzero(direction)
+
+    strike_time = times[index] + params.timeframe
+    exp_time = strike_time + params.expiry
+    exp_index = numpy.searchsorted(times, exp_time - params.timeframe, "right") - 1
+    # Trades expiring after the last candle cannot be settled.
+    settled = exp_time <= times[-1] + params.timeframe if len(times) else exp_time < 0
+    index, strike_time, exp_time, exp_index = (
+        index[settled],
+        strike_time[settled],
+        exp_time[settled],
+        exp_index[settled],
+    )
+
+    direction = direction[index]
+    strike_rate = closes[index]
+    exp_rate = closes[exp_index]
+    move = numpy.sign(exp_rate - strike_rate) * direction
+    result_amount = numpy.where(
+        move > 0,
+        params.amount * params.profit / 100,
+        numpy.where(move < 0, -params.amount, 0.0),
+    )
+
+    return Trades(
+        index, direction, strike_time, strike_rate, exp_time, exp_rate, result_amount
+    )
+
+
+def run(candles: vectorized.Array, params: BacktestParameters) -> BacktestResult:
+    """Backtest the strategy over a (5 x n) candle window.
+
+    Args:
+        candles (Array): Time, open, high, low and close rows, as returned by
+            `CandleStore.range` or `CandleBuffer.window`.
+        params (BacktestParameters): The strategy and trade parameters.
+
+    Returns:
+        BacktestResult: The simulated trades and their summary.
+    """
+    buy, sell = signals(candles[CLOSE], params)
+    trades = simulate(candles, buy, sell, params)
+    wins = int((trades.result_amount > 0).sum())
+    losses = int((trades.result_amount < 0).sum())
+
+    return BacktestResult.model_construct(
+        trades=trades,
+        wins=wins,
+        losses=losses,
+        draws=len(trades.index) - wins - losses,
+        win_rate=wins / (wins + losses) if wins + losses else 0.0,
+        pnl=float(trades.result_amount.sum()),
+    )
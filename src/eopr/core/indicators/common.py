@@ -1,10 +1,116 @@
+import enum
+import functools
+import typing
+
 import pydantic
 
 FloatArray = list[float]
 CandlePrice = FloatArray
 
 
+class Trend(enum.StrEnum):
+    RISING = "rising"
+    FALLING = "falling"
+
+
+class Zone(enum.StrEnum):
+    OVERBOUGHT = "overbought"
+    OVERSOLD = "oversold"
+    NEUTRAL = "neutral"
+
+
 class TrendAnalysis(pydantic.BaseModel):
+    """The outcome of interpreting an indicator.
+
+    The MACD interpretation fills in the `*_trend` fields and `distance`, the RSI
+    interpretation fills in `value` and `zone`. The human-readable `interpretation`
+    is only rendered from them when it is first read, unless one was passed in
+    explicitly.
+    """
+
     bullish: bool
     bearish: bool
-    interpretation: str = pydantic.Field(default="")
+    macd_trend: Trend | None = None
+    signal_trend: Trend | None = None
+    histogram_trend: Trend | None = None
+    distance: float | None = None
+    value: float | None = None
+    zone: Zone | None = None
+    _interpretation: str | None = pydantic.PrivateAttr(default=None)
+
+    @pydantic.model_validator(mode="wrap")
+    @classmethod
+    def _explicit_interpretation(
+        cls, data: typing.Any, handler: pydantic.ModelWrapValidatorHandler[typing.Self]
+    ) -> typing.Self:
+        interpretation = None
+        if isinstance(data, dict) and "interpretation" in data:
+            data = dict(data)
+            interpretation = data.pop("interpretation")
+        analysis = handler(data)
+        if interpretation is not None:
+            analysis._interpretation = str(interpretation)
+
+        return analysis
+
+    @classmethod
+    def model_construct(
+        cls, _fields_set: set[str] | None = None, **values: typing.Any
+    ) -> typing.Self:
+        # Validators do not run here, so the explicit interpretation is taken over
+        # the same way as in `_explicit_interpretation`.
+        interpretation = values.pop("interpretation", None)
+        analysis = super().model_construct(_fields_set, **values)
+        if interpretation is not None:
+            analysis._interpretation = str(interpretation)
+
+        return analysis
+
+    @pydantic.computed_field
+    @functools.cached_property
+    def interpretation(self) -> str:
+        if self._interpretation is not None:
+            return self._interpretation
+        if self.zone is not None and self.value is not None:
+            return _render_rsi(self.value, self.zone)
+        if self.macd_trend is not None and self.signal_trend is not None:
+            return _render_macd(
+                self.macd_trend,
+                self.signal_trend,
+                self.histogram_trend,
+                self.distance or 0.0,
+            )
+
+        return ""
+
+
+def _render_macd(
+    macd_trend: Trend,
+    signal_trend: Trend,
+    histogram_trend: Trend | None,
+    distance: float,
+) -> str:
+    if macd_trend == signal_trend:
+        trend = f"The MACD and signal lines are both {macd_trend}."
+    else:
+        trend = (
+            f"The MACD line is {macd_trend} while the signal line is {signal_trend}."
+        )
+
+    trend += f" The distance between the MACD and signal lines is {distance:.2f}."
+
+    if histogram_trend == Trend.RISING:
+        trend += " The histogram is rising, indicating increasing bullish momentum."
+    else:
+        trend += " The histogram is falling, indicating increasing bearish momentum."
+
+    return trend
+
+
+def _render_rsi(value: float, zone: Zone) -> str:
+    if zone == Zone.NEUTRAL:
+        indication = "neither overbought nor oversold"
+    else:
+        indication = zone
+
+    return f"The RSI value is {value:.2f}, indicating that the asset is {indication}."
@@ -0,0 +1,230 @@
+"""
+eopr.core.indicators.graph
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+A shared graph of streaming indicators. Every node is keyed by (asset, timeframe,
+indicator, params) and exists once, however many strategies use it, so two MACD
+configurations with the same slow period share one slow EMA and the closes are only
+taken once per tick:
+
+    graph = IndicatorGraph()
+    fast = graph.acquire(160, 5, "macd", 12, 26, 9)
+    slow = graph.acquire(160, 5, "macd", 5, 26, 9)   # reuses the 26 EMA
+    graph.update(160, 5, t, close)                   # every node computed once
+    fast.value, slow.value
+
+Nodes are reference counted: `release` drops a consumer's reference and evicts the
+nodes nothing refers to any more. Like the `*State` classes, an update with the same
+time as the last one revises the still-forming candle and older ones are ignored.
+Nodes created while a series is running start from the next update, as a new
+`*State` would.
+
+New indicators are added by registering a builder in `NODE_TYPES`.
+"""
+
+import abc
+import time
+import typing
+
+from eopr import metrics
+from eopr.core.indicators.macd import EMAState, MACDPoint
+from eopr.core.indicators.rsi import RSIState
+
+Params = tuple[typing.Any, ...]
+NodeKey = tuple[str, Params]
+
+
+class Node(abc.ABC):
+    """An indicator value of one series, computed from its `inputs`.
+
+    `value` is the value as of the latest candle and `previous` as of the candle
+    before it.
+    """
+
+    __slots__ = ("series", "key", "inputs", "refs", "value", "previous")
+
+    def __init__(self, inputs: typing.Sequence["Node"] = ()) -> None:
+        self.series: Series | None = None
+        self.key: NodeKey = ("", ())
+        self.inputs = tuple(inputs)
+        self.refs = 0
+        self.value: typing.Any = None
+        self.previous: typing.Any = None
+
+    def step(self, new: bool) -> None:
+        """Recompute `value` from the inputs, for a new candle or a revised one."""
+        if new:
+            self.previous = self.value
+        self.value = self.compute(new)
+
+    @abc.abstractmethod
+    def compute(self, new: bool) -> typing.Any:
+        """The value as of the latest candle."""
+
+
+class CloseNode(Node):
+    __slots__ = ("close",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.close = 0.0
+
+    def compute(self, new: bool) -> float:
+        return self.close
+
+
+class EMANode(Node):
+    __slots__ = ("state",)
+
+    def __init__(self, source: Node, period: int) -> None:
+        super().__init__((source,))
+        self.state = EMAState(period)
+
+    def compute(self, new: bool) -> float:
+        price = self.inputs[0].value
+        return self.state.update(price) if new else self.state.revise(price)
+
+
+class DifferenceNode(Node):
+    __slots__ = ()
+
+    def compute(self, new: bool) -> float:
+        return self.inputs[0].value - self.inputs[1].value
+
+
+class MACDNode(Node):
+    __slots__ = ()
+
+    def compute(self, new: bool) -> MACDPoint:
+        macd_value, signal_value = self.inputs[0].value, self.inputs[1].value
+        return MACDPoint(macd_value, signal_value, macd_value - signal_value)
+
+
+class RSINode(Node):
+    __slots__ = ("state",)
+
+    def __init__(self, source: Node, period: int) -> None:
+        super().__init__((source,))
+        self.state = RSIState(period)
+
+    def compute(self, new: bool) -> float | None:
+        close = self.inputs[0].value
+        return self.state.update(close) if new else self.state.revise(close)
+
+
+NodeBuilder = typing.Callable[["Series", Params], Node]
+
+NODE_TYPES: dict[str, NodeBuilder] = {
+    "close": lambda series, params: CloseNode(),
+    "ema": lambda series, params: EMANode(series.acquire("close"), *params),
+    "macd_line": lambda series, params: DifferenceNode(
+        (series.acquire("ema", params[0]), series.acquire("ema", params[1]))
+    ),
+    "macd_signal": lambda series, params: EMANode(
+        series.acquire("macd_line", *params[:2]), params[2]
+    ),
+    "macd": lambda series, params: MACDNode(
+        (
+            series.acquire("macd_line", *params[:2]),
+            series.acquire("macd_signal", *params),
+        )
+    ),
+    "rsi": lambda series, params: RSINode(series.acquire("close"), *params),
+}
+
+
+class Series:
+    """The nodes of one (asset, timeframe), in dependency order."""
+
+    def __init__(self, asset_id: int, timeframe: int) -> None:
+        self.asset_id = asset_id
+        self.timeframe = timeframe
+        self.last_time: float | None = None
+        # Inputs are always created before the nodes using them, so insertion order
+        # is a valid evaluation order.
+        self.nodes: dict[NodeKey, Node] = {}
+
+    def acquire(self, indicator: str, *params: typing.Any) -> Node:
+        key = (indicator, params)
+        node = self.nodes.get(key)
+        if node is None:
+            if indicator not in NODE_TYPES:
+                raise ValueError(f"unknown indicator {indicator!r}")
+            node = NODE_TYPES[indicator](self, params)
+            node.series, node.key = self, key
+            self.nodes[key] = node
+
+        node.refs += 1
+        return node
+
+    def release(self, node: Node) -> None:
+        """Drop a reference on `node`; releasing an evicted node does nothing."""
+        if node.refs <= 0:
+            return
+
+        node.refs -= 1
+        if node.refs > 0:
+            return
+
+        self.nodes.pop(node.key, None)
+        node.series = None
+        for source in node.inputs:
+            self.release(source)
+
+    def update(self, t: float, close: float) -> bool:
+        """Compute every node for a candle; False if the candle is older than the
+        last one and was ignored."""
+        if self.last_time is not None and t < self.last_time:
+            return False
+
+        new = t != self.last_time
+        self.last_time = t
+        close_node = self.nodes.get(("close", ()))
+        if isinstance(close_node, CloseNode):
+            close_node.close = close
+        for node in self.nodes.values():
+            node.step(new)
+
+        return True
+
+
+class IndicatorGraph:
+    def __init__(self) -> None:
+        self.series: dict[tuple[int, int], Series] = {}
+
+    def acquire(
+        self, asset_id: int, timeframe: int, indicator: str, *params: typing.Any
+    ) -> Node:
+        """Get the node of an indicator, creating it and its inputs if needed, and
+        take a reference on it."""
+        series = self.series.get((asset_id, timeframe))
+        if series is None:
+            series = self.series[asset_id, timeframe] = Series(asset_id, timeframe)
+
+        return series.acquire(indicator, *params)
+
+    def release(self, node: Node) -> None:
+        """Drop a reference taken with `acquire`, evicting unreferenced nodes.
+        Releasing a node that was already evicted does nothing."""
+        series = node.series
+        if series is None:
+            return
+
+        series.release(node)
+        if not series.nodes:
+            self.series.pop((series.asset_id, series.timeframe), None)
+
+    def update(self, asset_id: int, timeframe: int, t: float, close: float) -> bool:
+        series = self.series.get((asset_id, timeframe))
+        if series is None:
+            return False
+        if not metrics.enabled:
+            return series.update(t, close)
+
+        started = time.perf_counter()
+        updated = series.update(t, close)
+        metrics.observe("indicator", started, asset=asset_id)
+        return updated
+
+    def __len__(self) -> int:
+        return sum(len(series.nodes) for series in self.series.values())
@@ -3,7 +3,7 @@ import typing
 import pydantic
 
 from eopr import errors
-from eopr.core.indicators.common import CandlePrice, FloatArray, TrendAnalysis
+from eopr.core.indicators.common import CandlePrice, FloatArray, Trend, TrendAnalysis
 
 MACDLine = FloatArray
 SignalLine = FloatArray
@@ -11,6 +11,23 @@ Histogram = FloatArray
 Interpretation = str
 
 
+class MACDPoint(typing.NamedTuple):
+    macd: float
+    signal: float
+    histogram: float
+
+
+def export_point(point: MACDPoint | None) -> tuple[float | None, ...]:
+    return (None, None, None) if point is None else tuple(point)
+
+
+def restore_point(values: typing.Sequence[float | None]) -> MACDPoint | None:
+    if any(value is None for value in values):
+        return None
+
+    return MACDPoint(*typing.cast(typing.Sequence[float], values))
+
+
 class MACDParameters(pydantic.BaseModel):
     prices: list[CandlePrice]
     fast: int
@@ -40,6 +57,98 @@ def ema(prices: FloatArray, period: int) -> FloatArray:
     return ema
 
 
+class EMAState:
+    """Streaming counterpart of `ema`.
+
+    Each call to `update` folds one more price into the average in constant time and
+    yields exactly the value `ema` would have produced at that position.
+    """
+
+    __slots__ = ("alpha", "value", "_previous")
+
+    # The length of `export`.
+    STATE_SIZE = 3
+
+    def __init__(self, period: int) -> None:
+        self.alpha = 2 / (period + 1)
+        self.value: float | None = None
+        self._previous: float | None = None
+
+    def export(self) -> tuple[float | None, ...]:
+        """The values `restore` rebuilds this state from."""
+        return (self.alpha, self.value, self._previous)
+
+    def restore(self, values: typing.Sequence[float | None]) -> None:
+        alpha, self.value, self._previous = values
+        self.alpha = float(typing.cast(float, alpha))
+
+    def update(self, price: float) -> float:
+        self._previous = self.value
+        if self.value is None:
+            self.value = price
+        else:
+            self.value = price * self.alpha + self.value * (1 - self.alpha)
+
+        return self.value
+
+    def revise(self, price: float) -> float:
+        """Replace the price passed to the last `update` (e.g. a still-forming candle)."""
+        self.value = self._previous
+        return self.update(price)
+
+
+class MACDState:
+    """Streaming counterpart of `macd`.
+
+    Keeps the fast, slow and signal EMA state so that every new close costs O(1)
+    instead of a full recompute over the price history. Feeding the closes of
+    `MACDParameters.prices` one by one yields the same `macd_line`, `signal_line` and
+    `histogram` values as `macd`.
+    """
+
+    __slots__ = ("fast", "slow", "signal", "last")
+
+    # The length of `export`.
+    STATE_SIZE = 3 * EMAState.STATE_SIZE + 3
+
+    def __init__(self, fast: int, slow: int, signal: int) -> None:
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+        self.last: MACDPoint | None = None
+
+    def export(self) -> tuple[float | None, ...]:
+        """The values `restore` rebuilds this state from."""
+        return (
+            *self.fast.export(),
+            *self.slow.export(),
+            *self.signal.export(),
+            *export_point(self.last),
+        )
+
+    def restore(self, values: typing.Sequence[float | None]) -> None:
+        size = EMAState.STATE_SIZE
+        self.fast.restore(values[:size])
+        self.slow.restore(values[size : 2 * size])
+        self.signal.restore(values[2 * size : 3 * size])
+        self.last = restore_point(values[3 * size :])
+
+    def update(self, close: float) -> MACDPoint:
+        macd_value = self.fast.update(close) - self.slow.update(close)
+        signal_value = self.signal.update(macd_value)
+        self.last = MACDPoint(macd_value, signal_value, macd_value - signal_value)
+
+        return self.last
+
+    def revise(self, close: float) -> MACDPoint:
+        """Replace the close passed to the last `update` (e.g. a still-forming candle)."""
+        macd_value = self.fast.revise(close) - self.slow.revise(close)
+        signal_value = self.signal.revise(macd_value)
+        self.last = MACDPoint(macd_value, signal_value, macd_value - signal_value)
+
+        return self.last
+
+
 def macd(macd_params: MACDParameters) -> MACDIndicator:
     @errors.error_handler(macd_params.err_handler)
     def _macd(macd_params: MACDParameters):
@@ -53,11 +162,11 @@ def macd(macd_params: MACDParameters) -> MACDIndicator:
         signal_line = ema(macd_line, macd_params.signal)
         histogram = [macd - signal for macd, signal in zip(macd_line, signal_line)]
 
-        return MACDIndicator(
+        return MACDIndicator.model_construct(
             macd_line=macd_line,
             signal_line=signal_line,
             histogram=histogram,
-            analysis=TrendAnalysis(bullish=False, bearish=False),
+            analysis=TrendAnalysis.model_construct(bullish=False, bearish=False),
         )
 
     return _macd(macd_params)
@@ -75,10 +184,10 @@ def interpret_macd(macd: MACDIndicator) -> MACDIndicator:
     taking the absolute value of their difference. This distance can be used to gauge
     the strength of the current trend.
 
-    Finally, the function returns a string that describes the current trends of the MACD
-    line, signal line, and histogram. This string includes information about whether
-    these lines are rising or falling, as well as information about the distance between
-    the MACD and signal lines.
+    Finally, the function stores these trends and the distance in the indicator's
+    `analysis`. Its `interpretation` describes whether these lines are rising or
+    falling, as well as the distance between the MACD and signal lines, and is only
+    rendered when it is read.
 
     Args:
         macd_line (FloatArray): The MACD line values.
@@ -86,41 +195,30 @@ def interpret_macd(macd: MACDIndicator) -> MACDIndicator:
         histogram (FloatArray): The histogram values.
 
     Returns:
-        str: The interpretation of the MACD indicator.
+        MACDIndicator: The MACD indicator with its `analysis` filled in.
     """
 
     @errors.error_handler(macd.err_handler)
     def _interpret_macd(macd: MACDIndicator):
-        macd_trend = "rising" if macd.macd_line[-1] > macd.macd_line[-2] else "falling"
+        macd_trend = (
+            Trend.RISING if macd.macd_line[-1] > macd.macd_line[-2] else Trend.FALLING
+        )
         signal_trend = (
-            "rising" if macd.signal_line[-1] > macd.signal_line[-2] else "falling"
+            Trend.RISING
+            if macd.signal_line[-1] > macd.signal_line[-2]
+            else Trend.FALLING
         )
         histogram_trend = (
-            "rising" if macd.histogram[-1] > macd.histogram[-2] else "falling"
+            Trend.RISING if macd.histogram[-1] > macd.histogram[-2] else Trend.FALLING
         )
-        distance = abs(macd.macd_line[-1] - macd.signal_line[-1])
-
-        if macd_trend == signal_trend:
-            trend = f"The MACD and signal lines are both {macd_trend}."
-        else:
-            trend = (
-                f"The MACD line is {macd_trend} "
-                "while the signal line is {signal_trend}."
-            )
-
-        trend += f" The distance between the MACD and signal lines is {distance:.2f}."
-
-        if histogram_trend == "rising":
-            trend += " The histogram is rising, indicating increasing bullish momentum."
-        else:
-            trend += (
-                " The histogram is falling, indicating increasing bearish momentum."
-            )
 
-        macd.analysis = TrendAnalysis(
-            bullish=macd_trend == "rising",
-            bearish=macd_trend == "falling",
-            interpretation=trend,
+        macd.analysis = TrendAnalysis.model_construct(
+            bullish=macd_trend == Trend.RISING,
+            bearish=macd_trend == Trend.FALLING,
+            macd_trend=macd_trend,
+            signal_trend=signal_trend,
+            histogram_trend=histogram_trend,
+            distance=abs(macd.macd_line[-1] - macd.signal_line[-1]),
         )
 
         return macd
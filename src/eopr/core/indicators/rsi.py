@@ -3,7 +3,7 @@ import typing
 import pydantic
 
 from eopr import errors
-from eopr.core.indicators.common import CandlePrice, FloatArray, TrendAnalysis
+from eopr.core.indicators.common import CandlePrice, FloatArray, TrendAnalysis, Zone
 
 RSIValues = FloatArray
 Interpretation = str
@@ -27,6 +27,108 @@ class RSIIndicator(pydantic.BaseModel):
     )
 
 
+class RSIState:
+    """Streaming counterpart of `rsi`.
+
+    Keeps the previous close and the Wilder averages so that every new close costs
+    O(1). `update` returns None while the averages are still being seeded, and
+    afterwards the same values `rsi` would have appended to `rsi_values`.
+    """
+
+    __slots__ = (
+        "period",
+        "last",
+        "_close",
+        "_count",
+        "_avg_gain",
+        "_avg_loss",
+        "_previous",
+    )
+
+    # The length of `export`.
+    STATE_SIZE = 11
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.last: float | None = None
+        self._close: float | None = None
+        self._count = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._previous: tuple[float | None, float | None, int, float, float] = (
+            None,
+            None,
+            0,
+            0.0,
+            0.0,
+        )
+
+    def export(self) -> tuple[float | None, ...]:
+        """The values `restore` rebuilds this state from."""
+        return (
+            self.period,
+            self.last,
+            self._close,
+            self._count,
+            self._avg_gain,
+            self._avg_loss,
+            *self._previous,
+        )
+
+    def restore(self, values: typing.Sequence[typing.Any]) -> None:
+        period, self.last, self._close, count, avg_gain, avg_loss = values[:6]
+        last, close, previous_count, gain, loss = values[6:]
+        self.period = int(period)
+        self._count = int(count)
+        self._avg_gain = float(avg_gain)
+        self._avg_loss = float(avg_loss)
+        self._previous = (last, close, int(previous_count), float(gain), float(loss))
+
+    def update(self, close: float) -> float | None:
+        self._previous = (
+            self.last,
+            self._close,
+            self._count,
+            self._avg_gain,
+            self._avg_loss,
+        )
+        previous_close = self._close
+        self._close = close
+        if previous_close is None:
+            return None
+
+        change = close - previous_close
+        gain = change if change > 0 else 0
+        loss = -change if change < 0 else 0
+        self._count += 1
+
+        if self._count <= self.period:
+            self._avg_gain += gain
+            self._avg_loss += loss
+            if self._count == self.period:
+                self._avg_gain /= self.period
+                self._avg_loss /= self.period
+            return None
+
+        self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+        self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        rs = self._avg_gain / self._avg_loss if self._avg_loss != 0 else 0
+        self.last = 100 - (100 / (1 + rs))
+
+        return self.last
+
+    def revise(self, close: float) -> float | None:
+        """Replace the close passed to the last `update` (e.g. a still-forming candle)."""
+        (
+            self.last,
+            self._close,
+            self._count,
+            self._avg_gain,
+            self._avg_loss,
+        ) = self._previous
+        return self.update(close)
+
+
 def rsi(rsi_params: RSIParameters) -> RSIIndicator:
     @errors.error_handler(rsi_params.err_handler)
     def _rsi(rsi_params: RSIParameters):
@@ -51,11 +153,11 @@ def rsi(rsi_params: RSIParameters) -> RSIIndicator:
             rsi = 100 - (100 / (1 + rs))
             rsi_values.append(rsi)
 
-        return RSIIndicator(
+        return RSIIndicator.model_construct(
             rsi_values=rsi_values,
             overbought=70,
             oversold=30,
-            analysis=TrendAnalysis(bullish=False, bearish=False),
+            analysis=TrendAnalysis.model_construct(bullish=False, bearish=False),
             err_handler=rsi_params.err_handler,
         )
 
@@ -67,32 +169,18 @@ def interpret_rsi(rsi_indicator: RSIIndicator) -> RSIIndicator:
     def _interpret_rsi(rsi_indicator: RSIIndicator):
         last_rsi = rsi_indicator.rsi_values[-1]
         if last_rsi > rsi_indicator.overbought:
-            rsi_indicator.analysis = TrendAnalysis(
-                bullish=False,
-                bearish=True,
-                interpretation=(
-                    f"The RSI value is {last_rsi:.2f}, "
-                    "indicating that the asset is overbought."
-                ),
-            )
+            zone = Zone.OVERBOUGHT
         elif last_rsi < rsi_indicator.oversold:
-            rsi_indicator.analysis = TrendAnalysis(
-                bullish=True,
-                bearish=False,
-                interpretation=(
-                    f"The RSI value is {last_rsi:.2f}, "
-                    "indicating that the asset is oversold."
-                ),
-            )
+            zone = Zone.OVERSOLD
         else:
-            rsi_indicator.analysis = TrendAnalysis(
-                bullish=False,
-                bearish=False,
-                interpretation=(
-                    f"The RSI value is {last_rsi:.2f}, "
-                    "indicating that the asset is neither overbought nor oversold."
-                ),
-            )
+            zone = Zone.NEUTRAL
+
+        rsi_indicator.analysis = TrendAnalysis.model_construct(
+            bullish=zone == Zone.OVERSOLD,
+            bearish=zone == Zone.OVERBOUGHT,
+            value=last_rsi,
+            zone=zone,
+        )
 
         return rsi_indicator
 
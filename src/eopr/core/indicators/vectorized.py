@@ -0,0 +1,168 @@
+"""
+eopr.core.indicators.vectorized
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+NumPy batch kernels for the MACD and RSI indicators. Every function works along the
+last axis, so a single call computes the indicator for every asset (row) at once. The
+values match the pure-Python `macd.macd` and `rsi.rsi` functions row by row.
+"""
+
+import itertools
+import math
+import typing
+
+import numpy
+import numpy.typing
+
+Array = numpy.typing.NDArray[numpy.float64]
+
+# Below this many rows, stepping through each row with Python floats is cheaper than
+# one NumPy operation per time step.
+ROW_LOOP_MAX_ROWS = 16
+
+
+class MACDArrays(typing.NamedTuple):
+    macd_line: Array
+    signal_line: Array
+    histogram: Array
+
+
+def closes(prices: numpy.typing.ArrayLike) -> Array:
+    """Get the close prices out of a batch of candles.
+
+    Args:
+        prices (ArrayLike): Either close prices shaped (assets x candles), or candles
+            shaped (assets x fields x candles) where the close is the last field, as it
+            is for both `CandlePrice` and OHLC layouts.
+
+    Returns:
+        Array: The close prices shaped (assets x candles).
+    """
+    values = numpy.asarray(prices, dtype=numpy.float64)
+    if values.ndim == 3:
+        return values[:, -1, :]
+
+    return values
+
+
+def ema(values: numpy.typing.ArrayLike, period: int) -> Array:
+    """Exponential moving average of every row of `values` along the last axis."""
+    alpha = 2 / (period + 1)
+    series = numpy.asarray(values, dtype=numpy.float64)
+    if series.shape[-1] == 0:
+        return series.copy()
+
+    rows = _rows(series)
+    if rows < ROW_LOOP_MAX_ROWS:
+        return numpy.array(
+            [
+                list(
+                    itertools.accumulate(
+                        row, lambda ema, price: price * alpha + ema * (1 - alpha)
+                    )
+                )
+                for row in series.reshape(rows, series.shape[-1]).tolist()
+            ]
+        ).reshape(series.shape)
+
+    # Time-major, contiguous copy so each step below is a single contiguous row op.
+    series = numpy.ascontiguousarray(numpy.moveaxis(series, -1, 0))
+    result = numpy.empty_like(series)
+    result[0] = series[0]
+    for i in range(1, len(series)):
+        result[i] = series[i] * alpha + result[i - 1] * (1 - alpha)
+
+    return numpy.moveaxis(result, 0, -1)
+
+
+def macd(
+    prices: numpy.typing.ArrayLike, fast: int, slow: int, signal: int
+) -> MACDArrays:
+    """Compute the MACD line, signal line and histogram for every asset at once.
+
+    Args:
+        prices (ArrayLike): See `closes`.
+        fast (int): The fast EMA period.
+        slow (int): The slow EMA period.
+        signal (int): The signal EMA period.
+
+    Returns:
+        MACDArrays: The MACD arrays, each shaped (assets x candles).
+    """
+    close_prices = closes(prices)
+    macd_line = ema(close_prices, fast) - ema(close_prices, slow)
+    signal_line = ema(macd_line, signal)
+
+    return MACDArrays(macd_line, signal_line, macd_line - signal_line)
+
+
+def rsi(prices: numpy.typing.ArrayLike, period: int) -> Array:
+    """Compute the RSI values for every asset at once.
+
+    Args:
+        prices (ArrayLike): See `closes`.
+        period (int): The RSI period.
+
+    Returns:
+        Array: The RSI values shaped (assets x (candles - period - 1)), i.e. the same
+            values `rsi.rsi` returns in `rsi_values` for each asset.
+    """
+    close_prices = closes(prices)
+    changes = numpy.diff(close_prices, axis=-1)
+    gains = numpy.where(changes > 0, changes, 0.0)
+    losses = numpy.where(changes < 0, -changes, 0.0)
+    avg_gain = _wilder(gains, period)
+    avg_loss = _wilder(losses, period)
+
+    rs = numpy.zeros_like(avg_gain)
+    numpy.divide(avg_gain, avg_loss, out=rs, where=avg_loss != 0)
+
+    return 100 - (100 / (1 + rs))
+
+
+def _rows(series: Array) -> int:
+    return math.prod(series.shape[:-1])
+
+
+def _wilder(values: Array, period: int) -> Array:
+    """Wilder's smoothed average of every row, from the `period + 1`-th value on.
+
+    The seed average is summed one value at a time (rather than with `sum`) to keep
+    the exact rounding of the pure-Python implementation.
+    """
+    rows = _rows(values)
+    if rows < ROW_LOOP_MAX_ROWS:
+        return numpy.array(
+            [
+                _wilder_row(row, period)
+                for row in values.reshape(rows, values.shape[-1]).tolist()
+            ],
+            dtype=numpy.float64,
+        ).reshape(*values.shape[:-1], max(values.shape[-1] - period, 0))
+
+    values = numpy.moveaxis(values, -1, 0)
+    average = numpy.zeros(values.shape[1:])
+    for i in range(min(period, len(values))):
+        average += values[i]
+    average /= period
+
+    averages = numpy.empty((max(len(values) - period, 0), *values.shape[1:]))
+    for i in range(period, len(values)):
+        average = (average * (period - 1) + values[i]) / period
+        averages[i - period] = average
+
+    return numpy.moveaxis(averages, 0, -1)
+
+
+def _wilder_row(values: list[float], period: int) -> list[float]:
+    average = 0.0
+    for value in values[:period]:
+        average += value
+    average /= period
+
+    averages: list[float] = []
+    for value in values[period:]:
+        average = (average * (period - 1) + value) / period
+        averages.append(average)
+
+    return averages
@@ -0,0 +1,274 @@
+"""
+eopr.core.optimizer
+~~~~~~~~~~~~~~~~~~~
+
+Parameter sweeps of the MACD RSI crossover strategy over stored candles, ranked by
+the simulated binary-option P&L of `backtest.run`:
+
+    space = SearchSpace(fast=range(5, 20), slow=range(20, 40), oversold=[20, 30])
+    results = sweep(store.range(160, 5, start, end), grid(space))
+    best = results[0].params
+
+Configurations are evaluated in chunks spread over worker processes. Within a chunk,
+every distinct MACD crossover is computed once and shared by the configurations using
+it, as the indices of the candles it crosses at. The EMAs, RSIs and the outcome a call
+or put opened at each candle would have are computed once per process, so scoring a
+configuration only looks them up at its crossings; nothing the size of (configurations
+x candles) is ever allocated. Every result is the one `backtest.run` gives for the same
+parameters.
+"""
+
+import concurrent.futures
+import itertools
+import os
+import random
+import typing
+
+import numpy
+import numpy.typing
+import pydantic
+
+from eopr.core import backtest
+from eopr.core.indicators import vectorized
+from eopr.utils.candle_buffer import CLOSE, TIME
+
+# Configurations per chunk, i.e. per unit of work handed to a worker.
+CHUNK_SIZE = 256
+
+
+class SearchSpace(pydantic.BaseModel):
+    """The values to try for each strategy parameter."""
+
+    fast: list[int] = [12]
+    slow: list[int] = [26]
+    signal: list[int] = [9]
+    period: list[int] = [14]
+    overbought: list[float] = [70]
+    oversold: list[float] = [30]
+
+
+class SweepResult(pydantic.BaseModel):
+    params: backtest.BacktestParameters
+    trades: int
+    wins: int
+    losses: int
+    draws: int
+    win_rate: float
+    pnl: float
+
+
+def grid(
+    space: SearchSpace, trade: backtest.BacktestParameters | None = None
+) -> list[backtest.BacktestParameters]:
+    """Every combination of `space`, skipping those with `fast >= slow`.
+
+    The timeframe, expiry and payout are taken from `trade`.
+    """
+    base = (trade or backtest.BacktestParameters()).model_dump()
+    return [
+        backtest.BacktestParameters.model_construct(
+            **{
+                **base,
+                "fast": fast,
+                "slow": slow,
+                "signal": signal,
+                "period": period,
+                "overbought": overbought,
+                "oversold": oversold,
+            }
+        )
+        for fast, slow, signal, period, overbought, oversold in itertools.product(
+            space.fast,
+            space.slow,
+            space.signal,
+            space.period,
+            space.overbought,
+            space.oversold,
+        )
+        if fast < slow
+    ]
+
+
+def random_search(
+    space: SearchSpace,
+    samples: int,
+    trade: backtest.BacktestParameters | None = None,
+    seed: int | None = None,
+) -> list[backtest.BacktestParameters]:
+    """`samples` distinct configurations drawn at random from `grid(space, trade)`."""
+    configs = grid(space, trade)
+    return random.Random(seed).sample(configs, min(samples, len(configs)))
+
+
+def outcomes(
+    candles: vectorized.Array, trade: backtest.BacktestParameters
+) -> tuple[vectorized.Array, vectorized.Array, numpy.typing.NDArray[numpy.bool_]]:
+    """What a call and a put opened at each candle would return, as `backtest.simulate`
+    settles them, and which candles' trades can be settled at all."""
+    times = candles[TIME]
+    closes = candles[CLOSE]
+    strike_time = times + trade.timeframe
+    exp_time = strike_time + trade.expiry
+    exp_index = numpy.searchsorted(times, exp_time - trade.timeframe, "right") - 1
+    settled = exp_time <= times[-1] + trade.timeframe if len(times) else exp_time < 0
+
+    move = numpy.where(settled, numpy.sign(closes[exp_index] - closes), 0.0)
+    win = trade.amount * trade.profit / 100
+    call = numpy.where(move > 0, win, numpy.where(move < 0, -trade.amount, 0.0))
+    put = numpy.where(move < 0, win, numpy.where(move > 0, -trade.amount, 0.0))
+
+    return call, put, settled
+
+
+class Indicators:
+    """The EMAs, RSIs and trade outcomes of one candle window, computed on first use
+    and shared by every chunk scored in the same process."""
+
+    def __init__(self, candles: vectorized.Array) -> None:
+        self.candles = candles
+        self.closes = numpy.ascontiguousarray(candles[CLOSE], dtype=numpy.float64)
+        self.emas: dict[int, vectorized.Array] = {}
+        self.rsis: dict[int, vectorized.Array] = {}
+        self.settlements: dict[
+            tuple[float, ...],
+            tuple[
+                vectorized.Array, vectorized.Array, numpy.typing.NDArray[numpy.bool_]
+            ],
+        ] = {}
+
+    def ema(self, period: int) -> vectorized.Array:
+        if period not in self.emas:
+            self.emas[period] = vectorized.ema(self.closes, period)
+        return self.emas[period]
+
+    def crossings(
+        self, fast: int, slow: int, signal: int
+    ) -> numpy.typing.NDArray[numpy.intp]:
+        """The candles at which the MACD line crosses above its signal line."""
+        macd_line = self.ema(fast) - self.ema(slow)
+        signal_line = vectorized.ema(macd_line, signal)
+        crossed = (macd_line[:-1] < signal_line[:-1]) & (
+            macd_line[1:] > signal_line[1:]
+        )
+        return numpy.flatnonzero(crossed) + 1
+
+    def rsi(self, period: int) -> vectorized.Array:
+        if period not in self.rsis:
+            values = numpy.full(len(self.closes), numpy.nan)
+            values[period + 1 :] = vectorized.rsi(self.closes, period)
+            self.rsis[period] = values
+        return self.rsis[period]
+
+    def settlement(
+        self, trade: backtest.BacktestParameters
+    ) -> tuple[vectorized.Array, vectorized.Array, numpy.typing.NDArray[numpy.bool_]]:
+        """See `outcomes`."""
+        key = _trade_key(trade)
+        if key not in self.settlements:
+            self.settlements[key] = outcomes(self.candles, trade)
+        return self.settlements[key]
+
+
+def score(
+    indicators: Indicators, configs: typing.Sequence[backtest.BacktestParameters]
+) -> list[SweepResult]:
+    """Backtest `configs` together in this process; see the module docstring."""
+    crossings: dict[tuple[int, int, int], numpy.typing.NDArray[numpy.intp]] = {}
+    results: list[SweepResult] = []
+    for params in configs:
+        call, put, settled = indicators.settlement(params)
+        key = (params.fast, params.slow, params.signal)
+        if key not in crossings:
+            crossings[key] = indicators.crossings(*key)
+        index = crossings[key]
+
+        rsi_values = indicators.rsi(params.period)[index]
+        buy = rsi_values > params.oversold
+        sell = rsi_values < params.overbought
+        opened = buy != sell
+        index, is_call = index[opened], buy[opened]
+        settles = settled[index]
+        index, is_call = index[settles], is_call[settles]
+
+        returns = numpy.where(is_call, call[index], put[index])
+        wins = int(numpy.count_nonzero(returns > 0))
+        losses = int(numpy.count_nonzero(returns < 0))
+        results.append(
+            SweepResult.model_construct(
+                params=params,
+                trades=len(index),
+                wins=wins,
+                losses=losses,
+                draws=len(index) - wins - losses,
+                win_rate=wins / (wins + losses) if wins + losses else 0.0,
+                pnl=float(returns.sum()),
+            )
+        )
+
+    return results
+
+
+def _trade_key(params: backtest.BacktestParameters) -> tuple[float, ...]:
+    return (params.timeframe, params.expiry, params.profit, params.amount)
+
+
+def _sort_key(params: backtest.BacktestParameters) -> tuple[float, ...]:
+    return (*_trade_key(params), params.fast, params.slow, params.signal, params.period)
+
+
+_indicators: Indicators | None = None
+
+
+def _init_worker(candles: vectorized.Array) -> None:
+    global _indicators
+    _indicators = Indicators(candles)
+
+
+def _score_chunk(
+    configs: list[backtest.BacktestParameters],
+) -> list[SweepResult]:
+    assert _indicators is not None
+    return score(_indicators, configs)
+
+
+def sweep(
+    candles: vectorized.Array,
+    configs: typing.Iterable[backtest.BacktestParameters],
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> list[SweepResult]:
+    """Backtest every configuration over a (5 x n) candle window.
+
+    Args:
+        candles (Array): Time, open, high, low and close rows, as returned by
+            `CandleStore.range` or `CandleBuffer.window`.
+        configs (Iterable[BacktestParameters]): The configurations, e.g. from `grid`
+            or `random_search`.
+        workers (int | None): Worker processes; one per CPU core by default, and
+            none at all (everything runs here) with 1.
+        chunk_size (int): Configurations per chunk of work.
+
+    Returns:
+        list[SweepResult]: One result per configuration, best P&L first.
+    """
+    window = numpy.ascontiguousarray(candles, dtype=numpy.float64)
+    # Neighbouring configurations then share their trade settings and MACD lines.
+    configs = sorted(configs, key=_sort_key)
+    chunks = [configs[i : i + chunk_size] for i in range(0, len(configs), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    if workers <= 1:
+        indicators = Indicators(window)
+        results = [result for chunk in chunks for result in score(indicators, chunk)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(window,)
+        ) as executor:
+            results = [
+                result
+                for chunk_results in executor.map(_score_chunk, chunks)
+                for result in chunk_results
+            ]
+
+    results.sort(key=lambda result: result.pnl, reverse=True)
+    return results
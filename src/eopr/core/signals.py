@@ -0,0 +1,10 @@
+"""
+eopr.core.signals
+~~~~~~~~~~~~~~~~~
+
+Trade directions shared by the backtests and the live trading paths: a buy signal is
+a call and a sell signal a put.
+"""
+
+CALL = 1
+PUT = -1
@@ -6,14 +6,19 @@ The MACD RSI Crossover Trading Strategy is a popular trading strategy that uses
 Moving Average Convergence Divergence (MACD) and Relative Strength Index (RSI)
 indicators to identify buying and selling opportunities in the market. The MACD
 indicator is used to identify the trend of the market while the RSI indicator is used to
-identify whether an asset is overbought or oversold. When the MACD line crosses above 
+identify whether an asset is overbought or oversold. When the MACD line crosses above
 the signal line and the RSI indicates that the asset is either overbought or oversold,
 it can be a signal to buy or sell
 """
 
+import time
+import typing
+
 import pydantic
 
+from eopr import metrics
 from eopr.core.indicators import macd, rsi
+from eopr.core.indicators.graph import IndicatorGraph
 
 
 class TradeSignal(pydantic.BaseModel):
@@ -88,10 +93,159 @@ def trade(rsi: rsi.RSIIndicator, macd: macd.MACDIndicator) -> TradeSignal:
     """
 
     macd_cross = check_macd_cross(macd.macd_line, macd.signal_line)
-    trade_signal = TradeSignal()
+    trade_signal = TradeSignal.model_construct()
     trade_signal.buy = macd_cross and check_rsi_overbought(rsi.rsi_values, rsi.oversold)
     trade_signal.sell = macd_cross and check_rsi_oversold(
         rsi.rsi_values, rsi.overbought
     )
 
     return trade_signal
+
+
+def _count(signal: TradeSignal) -> None:
+    if signal.buy or signal.sell:
+        metrics.SIGNALS.labels("buy" if signal.buy else "sell").inc()
+
+
+class CrossoverState:
+    """Streaming counterpart of `trade` for the candles of one asset.
+
+    `update` takes the start time and close of the latest candle of a timeframe, as
+    found in every `candles` frame, and returns the signal `trade` would give for the
+    candles seen so far. Repeated updates of the still-forming candle revise it
+    instead of adding a new one.
+    """
+
+    __slots__ = ("macd", "rsi", "overbought", "oversold", "last_time", "_previous")
+
+    # The length of `export`.
+    STATE_SIZE = 6 + macd.MACDState.STATE_SIZE + rsi.RSIState.STATE_SIZE
+
+    def __init__(
+        self,
+        fast: int = 12,
+        slow: int = 26,
+        signal: int = 9,
+        period: int = 14,
+        overbought: float = 70,
+        oversold: float = 30,
+    ) -> None:
+        self.macd = macd.MACDState(fast, slow, signal)
+        self.rsi = rsi.RSIState(period)
+        self.overbought = overbought
+        self.oversold = oversold
+        self.last_time: float | None = None
+        self._previous: macd.MACDPoint | None = None
+
+    def export(self) -> tuple[float | None, ...]:
+        """The values `restore` rebuilds this state from, e.g. for a checkpoint.
+
+        Changing their layout means bumping `eopr.storage.checkpoint.FORMAT_VERSION`.
+        """
+        return (
+            self.last_time,
+            self.overbought,
+            self.oversold,
+            *macd.export_point(self._previous),
+            *self.macd.export(),
+            *self.rsi.export(),
+        )
+
+    def restore(self, values: typing.Sequence[typing.Any]) -> None:
+        """Take over the state exported by another `CrossoverState`, parameters
+        included."""
+        if len(values) != self.STATE_SIZE:
+            raise ValueError(
+                f"expected {self.STATE_SIZE} state values, got {len(values)}"
+            )
+
+        macd_end = 6 + macd.MACDState.STATE_SIZE
+        self.last_time = values[0]
+        self.overbought = float(values[1])
+        self.oversold = float(values[2])
+        self._previous = macd.restore_point(values[3:6])
+        self.macd.restore(values[6:macd_end])
+        self.rsi.restore(values[macd_end:])
+
+    def update(self, t: float, close: float) -> TradeSignal:
+        measured = metrics.enabled
+        started = time.perf_counter() if measured else 0.0
+        if t == self.last_time:
+            point = self.macd.revise(close)
+            rsi_value = self.rsi.revise(close)
+        elif self.last_time is None or t > self.last_time:
+            self._previous = self.macd.last
+            point = self.macd.update(close)
+            rsi_value = self.rsi.update(close)
+            self.last_time = t
+        else:
+            return TradeSignal.model_construct()
+
+        if measured:
+            metrics.observe("indicator", started)
+        if rsi_value is None or self._previous is None:
+            return TradeSignal.model_construct()
+
+        macd_cross = (
+            self._previous.macd < self._previous.signal and point.macd > point.signal
+        )
+        signal = TradeSignal.model_construct(
+            buy=macd_cross and rsi_value > self.oversold,
+            sell=macd_cross and rsi_value < self.overbought,
+        )
+        if measured:
+            _count(signal)
+        return signal
+
+
+class SharedCrossover:
+    """`CrossoverState` over the nodes of an `IndicatorGraph`.
+
+    The MACD and RSI come from the graph, so strategies on the same asset share every
+    indicator they have in common. The graph is updated once per candle by the
+    caller, before `signal` is read by each strategy:
+
+        graph.update(asset_id, 5, t, close)
+        signals = [strategy.signal() for strategy in strategies]
+    """
+
+    __slots__ = ("graph", "macd", "rsi", "overbought", "oversold")
+
+    def __init__(
+        self,
+        graph: IndicatorGraph,
+        asset_id: int,
+        timeframe: int = 5,
+        fast: int = 12,
+        slow: int = 26,
+        signal: int = 9,
+        period: int = 14,
+        overbought: float = 70,
+        oversold: float = 30,
+    ) -> None:
+        self.graph = graph
+        self.macd = graph.acquire(asset_id, timeframe, "macd", fast, slow, signal)
+        self.rsi = graph.acquire(asset_id, timeframe, "rsi", period)
+        self.overbought = overbought
+        self.oversold = oversold
+
+    def signal(self) -> TradeSignal:
+        point: macd.MACDPoint | None = self.macd.value
+        previous: macd.MACDPoint | None = self.macd.previous
+        rsi_value: float | None = self.rsi.value
+        if rsi_value is None or previous is None or point is None:
+            return TradeSignal.model_construct()
+
+        macd_cross = previous.macd < previous.signal and point.macd > point.signal
+        signal = TradeSignal.model_construct(
+            buy=macd_cross and rsi_value > self.oversold,
+            sell=macd_cross and rsi_value < self.overbought,
+        )
+        if metrics.enabled:
+            _count(signal)
+        return signal
+
+    def close(self) -> None:
+        """Release the indicators, evicting those no other strategy uses."""
+        self.graph.release(self.macd)
+        self.graph.release(self.rsi)
@@ -0,0 +1,191 @@
+"""
+eopr.ingress
+~~~~~~~~~~~~
+
+A bounded queue between the socket thread and the strategy handlers. The socket thread
+only enqueues raw frames and goes back to reading; a worker thread feeds them to the
+handler, so a slow handler no longer holds up the socket:
+
+    ingress = IngressQueue(dispatcher, maxsize=256, policy=Policy.COALESCE)
+    ingress.start()
+    read(ReaderParams(..., on_message_strategy=ingress))
+
+When the handler falls behind, `policy` decides what happens to new frames:
+
+- `COALESCE`: a `candles` frame replaces the pending frame of the same asset, keeping
+  its place in line, so every asset is evaluated on its freshest tick. If the queue is
+  still full, the oldest frame is dropped.
+- `DROP_OLDEST`: the oldest pending frame is dropped.
+- `BLOCK`: the socket thread waits for room. A full queue that is not running (not
+  started yet, or stopped) would never make room, so `put` raises instead.
+
+Frames without an asset (responses to requests) are never coalesced or dropped.
+"""
+
+import collections
+import enum
+import threading
+import typing
+
+from eopr.utils.frame_decoder import RawFrame, read_action, read_asset_id
+
+Handler = typing.Callable[[typing.Any, RawFrame], typing.Any]
+
+
+class Policy(enum.StrEnum):
+    COALESCE = "coalesce"
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+
+class IngressStats(typing.NamedTuple):
+    received: int
+    handled: int
+    coalesced: int
+    dropped: int
+    pending: int
+
+
+def asset_key(message: RawFrame) -> int | None:
+    """The asset a `candles` frame belongs to, None for any other frame.
+
+    Frames are not parsed for it, so a frame that does not start with its `action`
+    counts as another frame.
+    """
+    if read_action(message, parse=False) != "candles":
+        return None
+
+    return read_asset_id(message)
+
+
+class IngressQueue:
+    """Hand frames from the socket thread to `handler` on a worker thread.
+
+    Args:
+        handler (Handler): The strategy handler, e.g. a `FrameDispatcher`.
+        maxsize (int): How many frames may be pending.
+        policy (Policy): What to do with new frames when `maxsize` are pending.
+        key (Callable): Gives the asset of a frame, or None for frames that must not
+            be coalesced or dropped.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        maxsize: int = 1024,
+        policy: Policy = Policy.COALESCE,
+        key: typing.Callable[[RawFrame], int | None] = asset_key,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.handler = handler
+        self.maxsize = maxsize
+        self.policy = Policy(policy)
+        self.key = key
+        self.received = 0
+        self.handled = 0
+        self.coalesced = 0
+        self.dropped = 0
+        # Asset ids for frames that may be coalesced or dropped, fresh `object()`s
+        # for the others; insertion order is arrival order.
+        self._pending: collections.OrderedDict[
+            typing.Hashable, tuple[typing.Any, RawFrame, bool]
+        ] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._running = False
+        self._worker: threading.Thread | None = None
+
+    def __call__(self, ws: typing.Any, message: RawFrame) -> None:
+        self.put(ws, message)
+
+    def put(self, ws: typing.Any, message: RawFrame) -> None:
+        """Queue a frame for the worker thread.
+
+        Raises:
+            RuntimeError: With `Policy.BLOCK`, if the queue is full and not running.
+        """
+        asset_id = self.key(message)
+        droppable = asset_id is not None
+        with self._lock:
+            if (
+                droppable
+                and self.policy == Policy.COALESCE
+                and asset_id in self._pending
+            ):
+                self._pending[asset_id] = (ws, message, True)
+                self.received += 1
+                self.coalesced += 1
+                return
+
+            if droppable and len(self._pending) >= self.maxsize:
+                if self.policy == Policy.BLOCK:
+                    while len(self._pending) >= self.maxsize:
+                        if not self._running:
+                            raise RuntimeError("IngressQueue is full and not running")
+                        self._not_full.wait()
+                else:
+                    self._drop_oldest()
+
+            self.received += 1
+            key: typing.Hashable = (
+                asset_id if droppable and self.policy == Policy.COALESCE else object()
+            )
+            self._pending[key] = (ws, message, droppable)
+            self._not_empty.notify()
+
+    def _drop_oldest(self) -> None:
+        for key, (_, _, droppable) in self._pending.items():
+            if droppable:
+                del self._pending[key]
+                self.dropped += 1
+                return
+
+    def get(self) -> tuple[typing.Any, RawFrame] | None:
+        """Wait for the oldest pending frame; None once stopped and drained."""
+        with self._lock:
+            while not self._pending and self._running:
+                self._not_empty.wait()
+            if not self._pending:
+                return None
+
+            _, (ws, message, _) = self._pending.popitem(last=False)
+            self._not_full.notify()
+            return ws, message
+
+    def start(self) -> None:
+        with self._lock:
+            self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Handle the frames still pending, then stop the worker thread."""
+        with self._lock:
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def stats(self) -> IngressStats:
+        with self._lock:
+            return IngressStats(
+                self.received,
+                self.handled,
+                self.coalesced,
+                self.dropped,
+                len(self._pending),
+            )
+
+    def _run(self) -> None:
+        while (item := self.get()) is not None:
+            ws, message = item
+            try:
+                self.handler(ws, message)
+            except Exception as e:
+                print(f"Error: {e}")
+            self.handled += 1
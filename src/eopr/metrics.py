@@ -0,0 +1,323 @@
+"""
+eopr.metrics
+~~~~~~~~~~~~
+
+Hot-path latency histograms and counters, exposed in the Prometheus text format on a
+local HTTP endpoint:
+
+    metrics.enable()
+    metrics.serve(9464)
+    read(ReaderParams(...))
+
+Once enabled, the readers, `FrameDispatcher`, `AssetRouter` and the crossover
+strategies record, in `eopr_stage_seconds`:
+
+- `frame`: the whole strategy handler call for a received frame,
+- `decode`: reading the action and decoding the frame, per action,
+- `handler`: the handlers of an action, per action,
+- `strategy`: the handlers of an asset (indicator and strategy updates), per asset,
+- `indicator`: the MACD and RSI updates of a `CrossoverState`, or of an
+  `IndicatorGraph` series per asset,
+
+and count frames, errors, reconnects and the buy and sell signals of `CrossoverState`,
+`SharedCrossover` and `ShardedEvaluator`. Other code can time its own stages:
+
+    with metrics.stage("order", asset=asset_id):
+        ...
+
+Everything is off by default: the instrumented code only checks `metrics.enabled` and
+skips timing altogether. Updates take no locks, so a concurrent update from another
+thread can on rare occasions be lost.
+"""
+
+import bisect
+import collections
+import contextlib
+import http.server
+import sys
+import threading
+import time
+import typing
+
+enabled = False
+
+# Seconds, from 10µs up.
+BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: typing.Sequence[float] = BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf bucket, not cumulative.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+M = typing.TypeVar("M", Counter, Histogram)
+
+
+class Family(typing.Generic[M]):
+    """A metric and its children, one per combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: typing.Sequence[str],
+        factory: typing.Callable[[], M],
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.factory = factory
+        self.children: dict[tuple[str, ...], M] = {}
+        if not self.labelnames:
+            self.labels()
+
+    def labels(self, *values: typing.Any) -> M:
+        key = tuple(map(str, values))
+        child = self.children.get(key)
+        if child is None:
+            child = self.children.setdefault(key, self.factory())
+
+        return child
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.families: dict[str, Family[typing.Any]] = {}
+
+    def counter(
+        self, name: str, help: str, labelnames: typing.Sequence[str] = ()
+    ) -> Family[Counter]:
+        return self._family(name, help, labelnames, Counter)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: typing.Sequence[str] = (),
+        buckets: typing.Sequence[float] = BUCKETS,
+    ) -> Family[Histogram]:
+        return self._family(name, help, labelnames, lambda: Histogram(buckets))
+
+    def _family(
+        self,
+        name: str,
+        help: str,
+        labelnames: typing.Sequence[str],
+        factory: typing.Callable[[], typing.Any],
+    ) -> Family[typing.Any]:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families.setdefault(
+                name, Family(name, help, labelnames, factory)
+            )
+
+        return family
+
+    def render(self) -> str:
+        """The current values in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for family in list(self.families.values()):
+            children = list(family.children.items())
+            kind = "histogram" if family.factory is not Counter else "counter"
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {kind}")
+            for values, child in children:
+                labels = list(zip(family.labelnames, values))
+                if isinstance(child, Counter):
+                    lines.append(
+                        f"{family.name}{_labels(labels)} {_number(child.value)}"
+                    )
+                    continue
+
+                total = 0
+                for bound, count in zip((*child.buckets, "+Inf"), child.counts):
+                    total += count
+                    le = bound if isinstance(bound, str) else _number(bound)
+                    lines.append(
+                        f"{family.name}_bucket{_labels([*labels, ('le', le)])} {total}"
+                    )
+                lines.append(f"{family.name}_sum{_labels(labels)} {_number(child.sum)}")
+                lines.append(f"{family.name}_count{_labels(labels)} {total}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: typing.Sequence[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+STAGES = REGISTRY.histogram(
+    "eopr_stage_seconds",
+    "Time spent in each processing stage of a frame.",
+    ("stage", "action", "asset"),
+)
+FRAMES = REGISTRY.counter("eopr_frames_total", "Frames received.")
+ERRORS = REGISTRY.counter("eopr_errors_total", "Errors reported by the readers.")
+RECONNECTS = REGISTRY.counter("eopr_reconnects_total", "Reconnections to the server.")
+SIGNALS = REGISTRY.counter(
+    "eopr_signals_total", "Trade signals with buy or sell set.", ("direction",)
+)
+
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def observe(
+    stage: str, started: float, action: str = "", asset: typing.Any = ""
+) -> None:
+    """Record the time since `started`, a `time.perf_counter()` reading."""
+    STAGES.labels(stage, action, asset).observe(time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def _timed(stage: str, action: str, asset: typing.Any) -> typing.Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, started, action, asset)
+
+
+def stage(
+    stage: str, action: str = "", asset: typing.Any = ""
+) -> typing.ContextManager[None]:
+    """Time the body of a `with` block as `stage`, if metrics are enabled."""
+    if not enabled:
+        return contextlib.nullcontext()
+
+    return _timed(stage, action, asset)
+
+
+class SamplingProfiler:
+    """Sample the stacks of the other threads every `interval` seconds.
+
+    The samples are kept in the collapsed-stack format read by flame graph tools,
+    and served on `/profile` when passed to `serve`.
+    """
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: collections.Counter[str] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        samples = self.samples.copy()
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack: list[str] = []
+                current: typing.Any = frame
+                while current is not None:
+                    code = current.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    current = current.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+
+def serve(
+    port: int = 9464,
+    host: str = "127.0.0.1",
+    profiler: SamplingProfiler | None = None,
+) -> http.server.ThreadingHTTPServer:
+    """Serve `/metrics` (and `/profile` with a profiler) from a daemon thread."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/metrics":
+                body = REGISTRY.render()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path == "/profile" and profiler is not None:
+                body = profiler.collapsed()
+                content_type = "text/plain; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: typing.Any) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
@@ -0,0 +1,27 @@
+"""
+eopr.ns
+~~~~~~~
+
+The `ns` ranges of the requests sent over one connection. Responses are routed to
+their consumer by `ns`, so every kind of request is numbered within a range of its own
+that the others never reach:
+
+- the handshake and the resume messages of `Session`: [HANDSHAKE, BACKFILL)
+- `Backfill`: [BACKFILL, TRADE_HISTORY)
+- `TradeHistorySync`: [TRADE_HISTORY, ORDERS)
+- `OrderDispatcher`: ORDERS and up
+"""
+
+HANDSHAKE = 1
+BACKFILL = 1_000_000
+TRADE_HISTORY = 1_000_000_000
+ORDERS = 2_000_000_000
+
+
+def check_handshake(last: int) -> None:
+    """Raise ValueError if a handshake numbered up to `last` would reach `Backfill`'s
+    range, e.g. with far too many assets."""
+    if last >= BACKFILL:
+        raise ValueError(
+            f"handshake ns {last} overlaps the Backfill range from {BACKFILL}"
+        )
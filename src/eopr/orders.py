@@ -0,0 +1,342 @@
+"""
+eopr.orders
+~~~~~~~~~~~
+
+Turning trade signals into orders with as little work as possible between the signal
+and the socket. Order messages are rendered from a template serialized once, with only
+the per-order fields patched in, and sent by a dedicated writer thread so neither the
+reader nor the strategy waits on the socket. Acknowledgements are matched to their
+order by `ns`, and the signal → send → ack latency of the latest orders is kept. Orders
+without an acknowledgement within `ack_timeout` seconds fail with a `TimeoutError`:
+
+    orders = OrderDispatcher(ws.send, OrderTemplate(token), amount=100, expiry=30)
+    dispatcher.on(orders.template.action, orders.on_ack)
+    evaluator = ShardedEvaluator(on_signal=orders.on_signal)
+    ...
+    orders.latencies()
+
+The order message is not part of docs/, so the action and field names live in
+`OrderTemplate` and can be changed there; by default an order is
+`{"action": "expertOption", "message": {"type": "call", "amount": 100, "assetid": 160,
+"strike_time": ..., "expired": ..., "is_demo": 1}, "token": ..., "ns": ...}`.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import json
+import queue
+import threading
+import time
+import typing
+
+from eopr import errors, metrics
+from eopr.core.signals import CALL, PUT
+from eopr.ns import ORDERS
+from eopr.core.strategies.macd_rsi_crossover import TradeSignal
+from eopr.payouts import PayoutTables
+from eopr.utils.frame_decoder import Frame
+
+Send = typing.Callable[[str], typing.Any]
+
+DEFAULT_NS_START = ORDERS
+DEFAULT_ACK_TIMEOUT = 10.0
+DEFAULT_MAX_RESULTS = 10_000
+DIRECTIONS = {CALL: "call", PUT: "put"}
+_TYPES = {direction: json.dumps(name) for direction, name in DIRECTIONS.items()}
+_SLOT = "@@{}@@"
+
+
+class OrderTemplate:
+    """An order message serialized once, with slots for the per-order fields.
+
+    Args:
+        token (str): The session token.
+        action (str): The order action.
+        fields (dict[str, str] | None): The message key of each order field, for
+            `type`, `amount`, `asset_id`, `strike_time`, `expired` and `is_demo`.
+        extra (dict[str, Any] | None): Constant message fields to add.
+    """
+
+    FIELDS = {
+        "type": "type",
+        "amount": "amount",
+        "asset_id": "assetid",
+        "strike_time": "strike_time",
+        "expired": "expired",
+        "is_demo": "is_demo",
+    }
+
+    def __init__(
+        self,
+        token: str,
+        action: str = "expertOption",
+        fields: dict[str, str] | None = None,
+        extra: dict[str, typing.Any] | None = None,
+    ) -> None:
+        self.action = action
+        keys = {**self.FIELDS, **(fields or {})}
+        message = {key: _SLOT.format(field) for field, key in keys.items()}
+        text = json.dumps(
+            {
+                "action": action,
+                "message": {**message, **(extra or {})},
+                "token": token,
+                "ns": _SLOT.format("ns"),
+            },
+            separators=(",", ":"),
+        )
+        text = text.replace("%", "%%")
+        for field in (*keys, "ns"):
+            text = text.replace(f'"{_SLOT.format(field)}"', f"%({field})s")
+        self._format = text
+
+    def render(
+        self,
+        ns: int,
+        direction: int,
+        amount: float,
+        asset_id: int,
+        strike_time: int,
+        expired: int,
+        is_demo: int,
+    ) -> str:
+        return self._format % {
+            "type": _TYPES[direction],
+            "amount": json.dumps(float(amount)),
+            "asset_id": int(asset_id),
+            "strike_time": int(strike_time),
+            "expired": int(expired),
+            "is_demo": int(is_demo),
+            "ns": int(ns),
+        }
+
+
+class OrderResult(typing.NamedTuple):
+    ns: int
+    asset_id: int
+    direction: int
+    signal_to_send: float
+    send_to_ack: float
+    message: typing.Any
+
+    @property
+    def signal_to_ack(self) -> float:
+        return self.signal_to_send + self.send_to_ack
+
+
+class _Order(typing.NamedTuple):
+    ns: int
+    asset_id: int
+    direction: int
+    amount: float
+    expired: int
+    signaled: float
+    future: "concurrent.futures.Future[OrderResult]"
+
+
+class OrderDispatcher:
+    """Send orders from a writer thread and time them until their acknowledgement.
+
+    `on_ack` must be registered as the handler of `template.action` on the connection's
+    `FrameDispatcher`.
+
+    Args:
+        send (Send): Sends a text frame, e.g. `WebSocketApp.send`.
+        template (OrderTemplate): Renders the order messages.
+        amount (float): The amount of orders placed by `on_signal`.
+        expiry (int): Seconds until the expiry of orders placed by `on_signal`.
+        is_demo (int): 1 for the demo account, 0 for the real one.
+        payouts (PayoutTables | None): When given, `on_signal` takes the expiry with
+            the best payout and skips orders paying less than `min_payout`.
+        min_payout (float): The lowest acceptable payout, in percent.
+        ns_start (int): The first `ns` given to an order.
+        ack_timeout (float): Seconds after sending an order without an
+            acknowledgement before its future fails.
+        max_results (int): How many of the latest `OrderResult`s to keep.
+    """
+
+    def __init__(
+        self,
+        send: Send,
+        template: OrderTemplate,
+        amount: float = 1,
+        expiry: int = 30,
+        is_demo: int = 1,
+        payouts: PayoutTables | None = None,
+        min_payout: float = 0,
+        ns_start: int = DEFAULT_NS_START,
+        ack_timeout: float = DEFAULT_ACK_TIMEOUT,
+        max_results: int = DEFAULT_MAX_RESULTS,
+    ) -> None:
+        self.send = send
+        self.template = template
+        self.amount = amount
+        self.expiry = expiry
+        self.is_demo = is_demo
+        self.payouts = payouts
+        self.min_payout = min_payout
+        self.ack_timeout = ack_timeout
+        self.results: collections.deque[OrderResult] = collections.deque(
+            maxlen=max_results
+        )
+        self._ns = itertools.count(ns_start)
+        self._queue: queue.SimpleQueue[_Order | None] = queue.SimpleQueue()
+        self._pending: dict[int, tuple[_Order, float]] = {}
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def submit(
+        self,
+        asset_id: int,
+        direction: int,
+        amount: float | None = None,
+        expired: int | None = None,
+        signaled: float | None = None,
+    ) -> "concurrent.futures.Future[OrderResult]":
+        """Queue an order for the writer thread.
+
+        Args:
+            asset_id (int): The asset.
+            direction (int): `CALL` or `PUT`.
+            amount (float | None): The amount; `self.amount` by default.
+            expired (int | None): The expiry time; `self.expiry` seconds from now by
+                default.
+            signaled (float | None): The `time.perf_counter()` reading of the signal;
+                now by default.
+
+        Returns:
+            Future[OrderResult]: Resolves once the order is acknowledged.
+        """
+        signaled = time.perf_counter() if signaled is None else signaled
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be CALL or PUT, not {direction}")
+        future: concurrent.futures.Future[OrderResult] = concurrent.futures.Future()
+        self._queue.put(
+            _Order(
+                next(self._ns),
+                asset_id,
+                direction,
+                self.amount if amount is None else amount,
+                int(time.time()) + self.expiry if expired is None else expired,
+                signaled,
+                future,
+            )
+        )
+
+        return future
+
+    def on_signal(self, asset_id: int, t: float, signal: TradeSignal) -> None:
+        """Place an order for a signal with only one of `buy` or `sell` set."""
+        signaled = time.perf_counter()
+        if signal.buy == signal.sell:
+            return
+
+        direction = CALL if signal.buy else PUT
+        expired = None
+        if self.payouts is not None:
+            expiry = self.payouts.best(asset_id, time.time(), direction)
+            if expiry is None or expiry.payout < self.min_payout:
+                return
+            expired = int(expiry.end)
+
+        self.submit(asset_id, direction, expired=expired, signaled=signaled)
+
+    def on_ack(self, ws: typing.Any, frame: Frame) -> None:
+        acked = time.perf_counter()
+        with self._lock:
+            pending = self._pending.pop(frame.ns, None) if frame.ns else None
+        if pending is None:
+            return
+
+        order, sent = pending
+        result = OrderResult(
+            order.ns,
+            order.asset_id,
+            order.direction,
+            sent - order.signaled,
+            acked - sent,
+            frame.message,
+        )
+        self.results.append(result)
+        if metrics.enabled:
+            metrics.STAGES.labels("order_ack", self.template.action, "").observe(
+                result.send_to_ack
+            )
+        order.future.set_result(result)
+
+    def latencies(self) -> list[tuple[float, float, float]]:
+        """(signal → send, send → ack, signal → ack) of the orders in `results`."""
+        return [
+            (result.signal_to_send, result.send_to_ack, result.signal_to_ack)
+            for result in self.results
+        ]
+
+    def close(self) -> None:
+        """Send the queued orders, then stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write(self) -> None:
+        render = self.template.render
+        while True:
+            try:
+                order = self._queue.get(timeout=self._expire())
+            except queue.Empty:
+                continue
+            if order is None:
+                break
+
+            message = render(
+                order.ns,
+                order.direction,
+                order.amount,
+                order.asset_id,
+                int(time.time()),
+                order.expired,
+                self.is_demo,
+            )
+            with self._lock:
+                self._pending[order.ns] = (order, time.perf_counter())
+            try:
+                self.send(message)
+            except Exception as e:
+                with self._lock:
+                    self._pending.pop(order.ns, None)
+                order.future.set_exception(errors.EoprError(e))
+                continue
+
+            if metrics.enabled:
+                metrics.observe("order_send", order.signaled, self.template.action)
+
+        self._expire()
+
+    def _expire(self) -> float | None:
+        """Fail the orders left without an acknowledgement for `ack_timeout`.
+
+        Returns:
+            float | None: Seconds until the next order times out, None if none is
+                pending.
+        """
+        now = time.perf_counter()
+        expired: list[_Order] = []
+        with self._lock:
+            # Orders are pending in the order they were sent.
+            for order, sent in self._pending.values():
+                if sent + self.ack_timeout > now:
+                    wait = sent + self.ack_timeout - now
+                    break
+                expired.append(order)
+            else:
+                wait = None
+            for order in expired:
+                del self._pending[order.ns]
+
+        for order in expired:
+            order.future.set_exception(
+                errors.EoprError(
+                    TimeoutError(f"order {order.ns} was not acknowledged in time")
+                )
+            )
+        return wait
@@ -0,0 +1,149 @@
+"""
+eopr.payouts
+~~~~~~~~~~~~
+
+Per-asset payout tables built from the `expTimes` of `candles` frames, so a strategy can
+look up the best expiry and payout for a signal without walking the nested lists:
+
+    payouts = PayoutTables()
+    dispatcher.on("candles", payouts, exp_times=True)
+    ...
+    expiry = payouts.best(asset_id, t, CALL)
+    if expiry is not None and expiry.payout >= 75:
+        ...
+
+Each `expTimes` entry is an expiry window `[start, end, tiers]`, and each tier is
+`[rate, call payout, put payout, type]`, e.g. `[30468.708, 76, 76, 1]`; type 1 is the
+tier struck at the current rate, the others are struck below or above it. Windows are
+kept sorted by `end`, and for every tier type the window with the best call and put
+payout from each position onwards is precomputed on update, so `best` is a bisection.
+"""
+
+import bisect
+import typing
+
+from eopr.core.signals import CALL, PUT
+from eopr.utils.frame_decoder import CandlesFrame
+
+AT_THE_MONEY = 1
+
+
+class Expiry(typing.NamedTuple):
+    start: float
+    end: float
+    rate: float
+    payout: float
+    type: int
+
+
+class PayoutTable:
+    """The expiry windows and payout tiers of one asset."""
+
+    __slots__ = ("starts", "ends", "tiers", "_best")
+
+    def __init__(self) -> None:
+        self.starts: list[float] = []
+        self.ends: list[float] = []
+        # Per window, tier type -> (rate, call payout, put payout).
+        self.tiers: list[dict[int, tuple[float, float, float]]] = []
+        # (tier type, direction) -> per window, the index of the best window from
+        # there to the last one, or -1 when none of them has the tier.
+        self._best: dict[tuple[int, int], list[int]] = {}
+
+    def update(self, exp_times: typing.Iterable[typing.Sequence[typing.Any]]) -> None:
+        """Replace the windows with those of the latest frame."""
+        windows = sorted(exp_times, key=lambda window: window[1])
+        count = len(windows)
+        if count != len(self.ends):
+            self.starts = [0.0] * count
+            self.ends = [0.0] * count
+            self.tiers = [{} for _ in range(count)]
+
+        kinds: set[int] = set()
+        for i, (start, end, tiers) in enumerate(windows):
+            self.starts[i] = start
+            self.ends[i] = end
+            by_type = self.tiers[i]
+            by_type.clear()
+            for rate, call, put, kind in tiers:
+                by_type[kind] = (rate, call, put)
+                kinds.add(kind)
+
+        self._best = {
+            (kind, direction): self._suffix_best(kind, direction)
+            for kind in kinds
+            for direction in (CALL, PUT)
+        }
+
+    def _suffix_best(self, kind: int, direction: int) -> list[int]:
+        column = 1 if direction == CALL else 2
+        best = [-1] * len(self.ends)
+        current = -1
+        for i in range(len(self.ends) - 1, -1, -1):
+            tier = self.tiers[i].get(kind)
+            if tier is not None and (
+                current == -1 or tier[column] >= self.tiers[current][kind][column]
+            ):
+                current = i
+            best[i] = current
+
+        return best
+
+    def best(self, t: float, direction: int, kind: int = AT_THE_MONEY) -> Expiry | None:
+        """The window ending after `t` with the best payout for `direction` (`CALL`
+        or `PUT`) on tiers of type `kind`; the earliest one on ties."""
+        best = self._best.get((kind, direction))
+        if best is None:
+            return None
+
+        i = bisect.bisect_right(self.ends, t)
+        if i == len(best) or best[i] == -1:
+            return None
+
+        return self._expiry(best[i], direction, kind)
+
+    def at(
+        self, expiry: float, direction: int, kind: int = AT_THE_MONEY
+    ) -> Expiry | None:
+        """The first window ending at or after `expiry`, if it has a tier of type
+        `kind`."""
+        i = bisect.bisect_left(self.ends, expiry)
+        if i == len(self.ends) or kind not in self.tiers[i]:
+            return None
+
+        return self._expiry(i, direction, kind)
+
+    def _expiry(self, i: int, direction: int, kind: int) -> Expiry:
+        rate, call, put = self.tiers[i][kind]
+        return Expiry(
+            self.starts[i], self.ends[i], rate, call if direction == CALL else put, kind
+        )
+
+
+class PayoutTables:
+    """A `PayoutTable` per asset, updated from `candles` frames.
+
+    Register it with `exp_times=True`, or the dispatcher cuts `expTimes` off the frames
+    before decoding them.
+    """
+
+    def __init__(self) -> None:
+        self.tables: dict[int, PayoutTable] = {}
+
+    def __call__(self, ws: typing.Any, frame: CandlesFrame) -> None:
+        if frame.exp_times is not None:
+            self.update(frame.asset_id, frame.exp_times)
+
+    def update(
+        self, asset_id: int, exp_times: typing.Iterable[typing.Sequence[typing.Any]]
+    ) -> None:
+        table = self.tables.get(asset_id)
+        if table is None:
+            table = self.tables[asset_id] = PayoutTable()
+        table.update(exp_times)
+
+    def best(
+        self, asset_id: int, t: float, direction: int, kind: int = AT_THE_MONEY
+    ) -> Expiry | None:
+        table = self.tables.get(asset_id)
+        return table.best(t, direction, kind) if table is not None else None
@@ -0,0 +1,136 @@
+"""
+eopr.recorder
+~~~~~~~~~~~~~
+
+Recording of raw server frames and replay of the recordings without a network.
+
+A recording is an append-only gzip stream of records, each a monotonic receive time,
+a type flag and the frame exactly as `on_message` got it. Every `FrameRecorder`
+session appends a new gzip member, so a file can be recorded into across restarts, and
+a record torn by a crash only ends the replay early.
+
+    read(ReaderParams(..., record_path="frames.gz"))
+    replay("frames.gz", strategy, speed=10)
+
+Receive times keep counting across sessions, so when replaying at a speed the pause
+between two frames is capped at `max_gap` recorded seconds rather than sitting through
+the downtime between sessions.
+"""
+
+import gzip
+import os
+import struct
+import time
+import typing
+import zlib
+
+import pydantic
+
+import eopr
+
+RECORD = struct.Struct("<dBI")
+TEXT = 0
+BINARY = 1
+DEFAULT_MAX_GAP = 10.0
+
+
+class FrameRecorder:
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._file = gzip.open(path, "ab")
+
+    def write(self, message: bytes | str) -> None:
+        if isinstance(message, str):
+            payload, kind = message.encode(), TEXT
+        else:
+            payload, kind = message, BINARY
+        self._file.write(RECORD.pack(time.monotonic(), kind, len(payload)))
+        self._file.write(payload)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_frames(
+    path: str | os.PathLike[str],
+) -> typing.Iterator[tuple[float, bytes | str]]:
+    """Yield the (monotonic receive time, frame) records of a recording."""
+    with gzip.open(path, "rb") as file:
+        while True:
+            try:
+                header = file.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    return
+                received, kind, size = RECORD.unpack(header)
+                payload = file.read(size)
+                if len(payload) < size:
+                    return
+                message = payload.decode() if kind == TEXT else payload
+            except (EOFError, OSError, ValueError, zlib.error):
+                # A torn record, possibly followed by later sessions' members that
+                # can no longer be told apart from it.
+                return
+
+            yield received, message
+
+
+class ReplaySocket:
+    """Stands in for the `WebSocketApp` during a replay, keeping what is sent."""
+
+    def __init__(self) -> None:
+        self.sent: list[typing.Any] = []
+
+    def send(self, data: typing.Any, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self.sent.append(data)
+
+
+class ReplayStats(pydantic.BaseModel):
+    frames: int
+    elapsed: float
+    frames_per_second: float
+
+
+def replay(
+    path: str | os.PathLike[str],
+    strategy_handler: typing.Callable[[typing.Any, typing.Any], typing.Any],
+    speed: float | None = None,
+    ws: typing.Any = None,
+    max_gap: float = DEFAULT_MAX_GAP,
+) -> ReplayStats:
+    """Feed a recording through `eopr.on_message` and `strategy_handler`.
+
+    Args:
+        path (str | os.PathLike[str]): The recording.
+        strategy_handler: The same handler that would be the `on_message_strategy`.
+        speed (float | None): 1 replays in real time, N replays N times faster and
+            None replays as fast as possible.
+        ws: What handlers get as the websocket; a new `ReplaySocket` by default.
+        max_gap (float): The longest pause between two frames, in recorded seconds,
+            e.g. across the downtime between two recording sessions.
+
+    Returns:
+        ReplayStats: How many frames were replayed and how fast.
+    """
+    ws = ReplaySocket() if ws is None else ws
+    frames = 0
+    previous: float | None = None
+    # Recorded seconds since the first frame, with every gap capped at `max_gap`.
+    offset = 0.0
+    start = time.perf_counter()
+
+    for received, message in read_frames(path):
+        if speed:
+            if previous is not None:
+                offset += min(max(received - previous, 0.0), max_gap)
+            previous = received
+            delay = offset / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        eopr.on_message(ws, message, strategy_handler)  # type: ignore
+        frames += 1
+
+    elapsed = time.perf_counter() - start
+    return ReplayStats(
+        frames=frames,
+        elapsed=elapsed,
+        frames_per_second=frames / elapsed if elapsed else 0.0,
+    )
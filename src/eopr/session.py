@@ -0,0 +1,192 @@
+"""
+eopr.session
+~~~~~~~~~~~~
+
+Session resume for the readers (`ReaderParams.resume`). The first connection sends the
+full handshake. Every later one only re-sends the context the candle stream depends
+on (`setContext`, `defaultSubscribeCandles` and `setTimeZone`, as sent in the first
+handshake), asks each asset's history for just the gap since its last received candle,
+and subscribes again. Reconnects wait an exponentially growing, jittered delay
+instead of a fixed one, reset once a connection has stayed up and kept receiving
+frames for `stable_after` seconds. Closing the socket from a handler ends the
+session instead of reconnecting.
+"""
+
+import random
+import threading
+import time
+import typing
+
+from eopr import handshake_messages, history_message
+from eopr.backfill import DEFAULT_CHUNK_SECONDS, chunk_periods
+from eopr.ns import check_handshake
+from eopr.utils.frame_decoder import (
+    RawFrame,
+    read_action,
+    read_asset_id,
+    read_candle_time,
+)
+
+Message = dict[str, typing.Any]
+
+RESUME_ACTIONS = {"setContext", "defaultSubscribeCandles", "setTimeZone"}
+
+
+class Backoff:
+    """Exponential backoff with full jitter: the n-th delay is drawn uniformly from
+    [0, min(maximum, initial * factor**n)]."""
+
+    def __init__(
+        self,
+        initial: float = 0.5,
+        maximum: float = 30,
+        factor: float = 2,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.attempts = 0
+        self._random = rng or random.Random()
+
+    def next(self) -> float:
+        ceiling = min(self.maximum, self.initial * self.factor**self.attempts)
+        self.attempts += 1
+        return self._random.uniform(0, ceiling)
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+def context_messages(handshake: typing.Iterable[Message]) -> list[Message]:
+    """The `RESUME_ACTIONS` of a handshake, with `multipleAction`s cut down to them."""
+    context: list[Message] = []
+    for message in handshake:
+        if message["action"] in RESUME_ACTIONS:
+            context.append(message)
+        elif message["action"] == "multipleAction":
+            actions = [
+                action
+                for action in message["message"]["actions"]
+                if action["action"] in RESUME_ACTIONS
+            ]
+            if actions:
+                context.append({**message, "message": {"actions": actions}})
+
+    return context
+
+
+def resume_messages(
+    token: str,
+    context: typing.Iterable[Message],
+    gaps: typing.Mapping[int, tuple[int, int]],
+    timeframe: int = 5,
+    chunk_seconds: int = DEFAULT_CHUNK_SECONDS,
+) -> list[Message]:
+    """The cached context, history requests covering `gaps` (asset id -> period) and
+    the candle subscription, numbered after the context."""
+    messages = [dict(message) for message in context]
+    for i, message in enumerate(messages, 1):
+        message["ns"] = i
+
+    ns = len(messages) + 1
+    for asset_id, (start, end) in gaps.items():
+        for period in chunk_periods(start, end, chunk_seconds):
+            messages.append(history_message(token, asset_id, period, timeframe, ns))
+            ns += 1
+    check_handshake(ns)
+    messages.append(
+        {
+            "action": "subscribeCandles",
+            "message": {"assetsIds": list(gaps)},
+            "token": token,
+            "ns": ns,
+        }
+    )
+
+    return messages
+
+
+class Session:
+    """What a reader needs to resume: the handshake context and, per asset, the time
+    of its last received candle.
+
+    Args:
+        token (str): The session token.
+        device_token (str): The device token of the full handshake.
+        asset_ids (Iterable[int]): The assets to subscribe to.
+        timeframe (int): The history timeframe to refill gaps with.
+        backoff (Backoff | None): The reconnect delays.
+        stable_after (float): How long a connection must have been up when a frame
+            arrives for the delays to start over.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        device_token: str,
+        asset_ids: typing.Iterable[int],
+        timeframe: int = 5,
+        backoff: Backoff | None = None,
+        stable_after: float = 10,
+    ) -> None:
+        self.token = token
+        self.device_token = device_token
+        self.asset_ids = list(asset_ids)
+        self.timeframe = timeframe
+        self.backoff = backoff or Backoff()
+        self.stable_after = stable_after
+        self.stopped = False
+        self.context: list[Message] | None = None
+        self.last_seen: dict[int, float] = {}
+        self._connected_at = 0.0
+        self._lock = threading.Lock()
+
+    def open_messages(self, now: float | None = None) -> list[Message]:
+        """The messages to send on a new connection."""
+        now = time.time() if now is None else now
+        with self._lock:
+            connected_at, self._connected_at = self._connected_at, now
+            if self.context is None:
+                handshake = handshake_messages(
+                    self.token, self.device_token, self.asset_ids
+                )
+                self.context = context_messages(handshake)
+                return handshake
+
+            gaps = {
+                asset_id: (
+                    self._bar(self.last_seen.get(asset_id, connected_at)),
+                    int(now),
+                )
+                for asset_id in self.asset_ids
+            }
+
+        return resume_messages(self.token, self.context, gaps, self.timeframe)
+
+    def observe(self, message: RawFrame) -> None:
+        """Note the arrival of a frame; `candles` frames mark their asset as seen up
+        to their candle time."""
+        now = time.time()
+        if self.backoff.attempts and now - self._connected_at >= self.stable_after:
+            self.backoff.reset()
+        if read_action(message, parse=False) != "candles":
+            return
+
+        asset_id = read_asset_id(message)
+        if asset_id is not None:
+            t = read_candle_time(message)
+            self.last_seen[asset_id] = now if t is None else t
+
+    def stop(self) -> None:
+        """Reconnect no more, e.g. once the socket was closed on purpose."""
+        self.stopped = True
+
+    def on_error(self, error: BaseException) -> None:
+        if isinstance(error, (KeyboardInterrupt, SystemExit)):
+            self.stop()
+
+    def _bar(self, t: float) -> int:
+        """The start of the bar `t` falls in, which the refill asks for again since it
+        may have changed after the last frame."""
+        return int(t // self.timeframe * self.timeframe)
@@ -0,0 +1,240 @@
+"""
+eopr.sharding
+~~~~~~~~~~~~~
+
+Strategy evaluation spread over worker processes. The reader only decodes frames and
+hands each asset's latest candle to the worker that owns the asset (`asset_id %
+workers`); every worker keeps the indicator state of its shard of assets, so only
+`(asset_id, t, close)` goes out and only `(asset_id, t, buy, sell)` comes back:
+
+    if __name__ == "__main__":
+        with ShardedEvaluator(workers=32, on_signal=place_order) as evaluator:
+            dispatcher.on("candles", evaluator)
+            read(ReaderParams(..., on_message_strategy=dispatcher))
+
+Workers are started with the "spawn" method by default, which needs the
+`if __name__ == "__main__"` guard above, and `state_factory` must be picklable.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import typing
+
+from eopr import errors, metrics
+from eopr.core.strategies.macd_rsi_crossover import CrossoverState, TradeSignal
+from eopr.utils.frame_decoder import CandlesFrame
+
+
+class AssetState(typing.Protocol):
+    def update(self, t: float, close: float) -> TradeSignal: ...
+
+
+StateFactory = typing.Callable[[int], AssetState]
+SignalHandler = typing.Callable[[int, float, TradeSignal], typing.Any]
+# Called with the asset id (None for a dead worker) and the error.
+ErrorHandler = typing.Callable[[int | None, Exception], typing.Any]
+
+# Seconds between the collector's checks that the workers are alive.
+WORKER_POLL = 0.5
+
+
+def crossover_state(asset_id: int) -> AssetState:
+    return CrossoverState()
+
+
+def default_error_handler(asset_id: int | None, error: Exception) -> None:
+    print(f"Error: {error}")
+
+
+def _worker(
+    index: int,
+    inbox: "multiprocessing.Queue[tuple[int, float, float] | None]",
+    outbox: "multiprocessing.Queue[typing.Any]",
+    state_factory: StateFactory,
+    only_actionable: bool,
+) -> None:
+    """Evaluate updates until None arrives, then put `index` on the outbox.
+
+    Signals go out as (asset_id, t, buy, sell) and errors as (asset_id, message),
+    since exceptions are not always picklable.
+    """
+    states: dict[int, AssetState] = {}
+    while (update := inbox.get()) is not None:
+        asset_id, t, close = update
+        try:
+            state = states.get(asset_id)
+            if state is None:
+                state = states[asset_id] = state_factory(asset_id)
+            signal = state.update(t, close)
+        except Exception as e:
+            outbox.put((asset_id, f"{type(e).__name__}: {e}"))
+            continue
+        if signal.buy or signal.sell or not only_actionable:
+            outbox.put((asset_id, t, signal.buy, signal.sell))
+
+    outbox.put(index)
+
+
+class ShardedEvaluator:
+    """Evaluate per-asset strategy state in `workers` processes.
+
+    Args:
+        workers (int | None): How many worker processes to run; one per CPU core
+            by default.
+        state_factory (StateFactory): Creates an asset's state inside its worker.
+        on_signal (SignalHandler | None): Called in a collector thread of this
+            process with the asset id, candle time and signal.
+        only_actionable (bool): Only send back signals with `buy` or `sell` set.
+        timeframe (int): Which candles of each frame are evaluated.
+        start_method (str): The multiprocessing start method.
+        on_error (ErrorHandler): Called in the collector thread with the errors of
+            state updates and of `on_signal`, and with workers that died. Updates for
+            the assets of a dead worker are dropped.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        state_factory: StateFactory = crossover_state,
+        on_signal: SignalHandler | None = None,
+        only_actionable: bool = True,
+        timeframe: int = 5,
+        start_method: str = "spawn",
+        on_error: ErrorHandler = default_error_handler,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.state_factory = state_factory
+        self.on_signal = on_signal
+        self.only_actionable = only_actionable
+        self.timeframe = timeframe
+        self.on_error = on_error
+        self._context = multiprocessing.get_context(start_method)
+        self._inboxes: list[multiprocessing.Queue[typing.Any]] = []
+        self._outbox: multiprocessing.Queue[typing.Any] | None = None
+        self._processes: list[multiprocessing.process.BaseProcess] = []
+        self._dead: set[int] = set()
+        self._collector: threading.Thread | None = None
+
+    def __enter__(self) -> "ShardedEvaluator":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._outbox = self._context.Queue()
+        self._dead = set()
+        self._inboxes = [self._context.Queue() for _ in range(self.workers)]
+        self._processes = [
+            self._context.Process(
+                target=_worker,
+                args=(
+                    index,
+                    inbox,
+                    self._outbox,
+                    self.state_factory,
+                    self.only_actionable,
+                ),
+                daemon=True,
+            )
+            for index, inbox in enumerate(self._inboxes)
+        ]
+        for process in self._processes:
+            process.start()
+
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Let the workers finish their queued updates, then stop them.
+
+        Args:
+            timeout (float | None): How long to wait for each worker before
+                terminating it; no limit by default. Workers that died are not
+                waited for.
+        """
+        for index, inbox in enumerate(self._inboxes):
+            if index not in self._dead:
+                inbox.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        if self._collector is not None:
+            self._collector.join()
+
+        self._inboxes = []
+        self._processes = []
+        self._collector = None
+
+    def submit(self, asset_id: int, t: float, close: float) -> None:
+        index = asset_id % self.workers
+        if index not in self._dead:
+            self._inboxes[index].put((asset_id, t, close))
+
+    def __call__(self, ws: typing.Any, frame: CandlesFrame) -> None:
+        for candle in frame.candles:
+            if candle.tf == self.timeframe:
+                self.submit(frame.asset_id, candle.t, candle.close)
+
+    def _collect(self) -> None:
+        assert self._outbox is not None
+        done: set[int] = set()
+        checked = time.monotonic()
+        while len(done) < self.workers:
+            if time.monotonic() - checked >= WORKER_POLL:
+                done.update(self._dead_workers(done))
+                checked = time.monotonic()
+            try:
+                result = self._outbox.get(timeout=WORKER_POLL)
+            except queue.Empty:
+                done.update(self._dead_workers(done))
+                checked = time.monotonic()
+                continue
+            if isinstance(result, int):
+                done.add(result)
+                continue
+            if len(result) == 2:
+                asset_id, message = result
+                self._report(asset_id, errors.EoprError(RuntimeError(message)))
+                continue
+            asset_id, t, buy, sell = result
+            if metrics.enabled and (buy or sell):
+                metrics.SIGNALS.labels("buy" if buy else "sell").inc()
+            if self.on_signal is not None:
+                try:
+                    self.on_signal(
+                        asset_id, t, TradeSignal.model_construct(buy=buy, sell=sell)
+                    )
+                except Exception as e:
+                    self._report(asset_id, errors.EoprError(e))
+
+    def _report(self, asset_id: int | None, error: Exception) -> None:
+        """Hand `error` to `on_error` without letting it stop the collector."""
+        try:
+            self.on_error(asset_id, error)
+        except Exception as e:
+            print(f"Error: {e}")
+
+    def _dead_workers(self, done: set[int]) -> list[int]:
+        """Report the workers that exited without finishing, e.g. killed by the OOM
+        killer; those that exited cleanly still have their `index` on its way."""
+        dead: list[int] = []
+        for index, process in enumerate(self._processes):
+            if index in done or process.is_alive() or process.exitcode == 0:
+                continue
+            dead.append(index)
+            self._dead.add(index)
+            self._report(
+                None,
+                errors.EoprError(
+                    RuntimeError(f"worker {index} exited with code {process.exitcode}")
+                ),
+            )
+
+        return dead
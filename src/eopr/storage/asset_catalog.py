@@ -0,0 +1,200 @@
+"""
+eopr.storage.asset_catalog
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+The `assets` list of the handshake (see docs/Assets.md) as compact records indexed by
+id, symbol and tradability, persisted as a versioned snapshot so a new process can
+route and filter assets before the server has answered:
+
+    catalog = AssetCatalog.open("data/assets.snapshot")
+    dispatcher.on("assets", catalog)
+    tradable = [a.id for a in catalog.by_symbol("EURUSD") if catalog.is_tradable(a.id)]
+
+Symbols are not unique (an asset and its OTC counterpart share one), so `by_symbol`
+returns every record with the symbol.
+
+A response to the handshake's request (a frame with an `ns`) replaces the catalog and
+is saved; pushed updates are merged into the records they name and only mark the
+catalog as changed. Every change bumps `version`.
+
+A snapshot is a header (magic, format version, catalog version, field count) followed
+by the records as compact JSON arrays. Snapshots of another format are ignored.
+"""
+
+import json
+import os
+import pathlib
+import struct
+import typing
+
+from eopr.storage import atomic_write
+from eopr.utils.frame_decoder import Frame
+
+MAGIC = b"EOPRASST"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQI")
+
+
+class AssetRecord(typing.NamedTuple):
+    id: int
+    symbol: str
+    name: str
+    group: str
+    asset_type: int
+    is_active: bool
+    profit: float
+    min_profit: float
+    max_profit: float
+    min_bet: float
+    max_bet: float
+    purchase_time: int
+    expiration_step: int
+    expiration_count: int
+    opentime: int
+    closetime: int
+    digits: int
+
+
+# Record field -> key in the server's asset objects.
+SERVER_KEYS = {field: field for field in AssetRecord._fields} | {
+    "group": "asset_group_id"
+}
+_DEFAULTS = AssetRecord(0, "", "", "", 0, False, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def parse_asset(
+    asset: dict[str, typing.Any], base: AssetRecord = _DEFAULTS
+) -> AssetRecord:
+    """Build a record from a server asset object, keeping the fields of `base` that
+    the object does not carry."""
+    changes = {field: asset[key] for field, key in SERVER_KEYS.items() if key in asset}
+    if "is_active" in changes:
+        changes["is_active"] = bool(changes["is_active"])
+
+    return base._replace(**changes)
+
+
+class AssetCatalog:
+    """Asset records indexed by id, symbol and tradability.
+
+    Args:
+        path (str | os.PathLike[str] | None): Where snapshots are saved.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = pathlib.Path(path) if path is not None else None
+        self.version = 0
+        self.saved_version = 0
+        self.records: dict[int, AssetRecord] = {}
+        self.symbols: dict[str, set[int]] = {}
+        self.tradable: set[int] = set()
+
+    @classmethod
+    def open(cls, path: str | os.PathLike[str]) -> "AssetCatalog":
+        """Load the snapshot at `path`, or start empty if there is none usable."""
+        catalog = cls(path)
+        try:
+            data = pathlib.Path(path).read_bytes()
+        except FileNotFoundError:
+            return catalog
+
+        if len(data) < HEADER.size:
+            return catalog
+        magic, format_version, version, fields = HEADER.unpack_from(data)
+        if (
+            magic != MAGIC
+            or format_version != FORMAT_VERSION
+            or fields != len(AssetRecord._fields)
+        ):
+            return catalog
+
+        try:
+            catalog._replace(
+                AssetRecord(*row) for row in json.loads(data[HEADER.size :])
+            )
+        except (ValueError, TypeError):
+            # A truncated or corrupt body.
+            return cls(path)
+
+        catalog.version = catalog.saved_version = version
+        return catalog
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, asset_id: int) -> AssetRecord | None:
+        return self.records.get(asset_id)
+
+    def by_symbol(self, symbol: str) -> list[AssetRecord]:
+        """The records with `symbol`, by id."""
+        return [self.records[i] for i in sorted(self.symbols.get(symbol, ()))]
+
+    def is_tradable(self, asset_id: int) -> bool:
+        return asset_id in self.tradable
+
+    def load(self, assets: typing.Iterable[dict[str, typing.Any]]) -> None:
+        """Replace the catalog with a full `assets` list."""
+        self._replace(parse_asset(asset) for asset in assets)
+        self.version += 1
+
+    def apply(self, assets: typing.Iterable[dict[str, typing.Any]]) -> list[int]:
+        """Merge updated asset objects into their records.
+
+        Returns:
+            list[int]: The ids of the records that changed.
+        """
+        changed: list[int] = []
+        for asset in assets:
+            old = self.records.get(asset["id"])
+            record = parse_asset(asset, old or _DEFAULTS)
+            if record == old:
+                continue
+            if old is not None and old.symbol != record.symbol:
+                ids = self.symbols[old.symbol]
+                ids.discard(old.id)
+                if not ids:
+                    del self.symbols[old.symbol]
+            self._index(record)
+            changed.append(record.id)
+
+        if changed:
+            self.version += 1
+        return changed
+
+    def save(self) -> None:
+        """Write a snapshot to `path`, atomically replacing the previous one."""
+        if self.path is None:
+            return
+
+        body = json.dumps(list(self.records.values()), separators=(",", ":"))
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, self.version, len(AssetRecord._fields)
+        )
+        atomic_write(self.path, header + body.encode())
+        self.saved_version = self.version
+
+    def __call__(self, ws: typing.Any, frame: Frame) -> None:
+        assets = (frame.message or {}).get("assets")
+        if assets is None:
+            return
+
+        if frame.ns is not None:
+            self.load(assets)
+            self.save()
+        else:
+            self.apply(assets)
+
+    def _replace(self, records: typing.Iterable[AssetRecord]) -> None:
+        self.records = {}
+        self.symbols = {}
+        self.tradable = set()
+        for record in records:
+            self._index(record)
+
+    def _index(self, record: AssetRecord) -> None:
+        self.records[record.id] = record
+        self.symbols.setdefault(record.symbol, set()).add(record.id)
+        if record.is_active:
+            self.tradable.add(record.id)
+        else:
+            self.tradable.discard(record.id)
@@ -0,0 +1,188 @@
+"""
+eopr.storage.candle_store
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Append-only, memory-mapped candle files, one per (asset, timeframe).
+
+A file is a 16-byte header followed by fixed-size records of five float64 values
+(time, open, high, low, close) sorted by time. The record count is derived from the
+file size, so a record torn by a crash mid-append is simply dropped the next time the
+file is opened. Range queries bisect a sparse in-memory index of every
+`index_stride`-th time and then a single block of the mapped file, and return views
+into the mapping in the same (5 x n) layout as `CandleBuffer.window`.
+"""
+
+import bisect
+import os
+import pathlib
+import struct
+import typing
+
+import numpy
+
+from eopr.core.indicators.vectorized import Array
+from eopr.utils.candle_parser import Candle, parse_candles
+
+MAGIC = b"EOPRCNDL"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<5d")
+DEFAULT_INDEX_STRIDE = 256
+
+
+class CandleFile:
+    """One (asset, timeframe) candle file.
+
+    Args:
+        path (str | os.PathLike[str]): The file, created if it does not exist.
+        timeframe (int): The timeframe stored in the header of a new file.
+        index_stride (int): How many records each sparse index entry covers.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        timeframe: int,
+        index_stride: int = DEFAULT_INDEX_STRIDE,
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.index_stride = index_stride
+        if not self.path.exists() or self.path.stat().st_size < HEADER.size:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(HEADER.pack(MAGIC, VERSION, timeframe))
+
+        self._file = open(self.path, "r+b", buffering=0)
+        magic, version, self.timeframe = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} candle file")
+
+        size = self.path.stat().st_size - HEADER.size
+        self._size = size // RECORD.size
+        if size % RECORD.size:
+            self._file.truncate(HEADER.size + self._size * RECORD.size)
+
+        self._map: numpy.memmap[typing.Any, numpy.dtype[numpy.float64]] | None = None
+        self._mapped = 0
+        self._last_time: float | None = None
+        self._index: list[float] = []
+        if self._size:
+            records = self._records()
+            self._last_time = float(records[-1, 0])
+            self._index = records[:: self.index_stride, 0].tolist()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> float | None:
+        return self._last_time
+
+    def upsert(self, candle: Candle) -> bool:
+        """Append `candle`, or overwrite the last record if it has the same time.
+
+        Candles older than the last record are ignored.
+
+        Returns:
+            bool: True if a new record was appended, False otherwise.
+        """
+        if self._last_time is not None and candle.t <= self._last_time:
+            if candle.t == self._last_time:
+                self._write(self._size - 1, candle)
+            return False
+
+        if self._size % self.index_stride == 0:
+            self._index.append(candle.t)
+        self._write(self._size, candle)
+        self._size += 1
+        self._last_time = candle.t
+
+        return True
+
+    def extend(self, candles: typing.Iterable[Candle]) -> None:
+        for candle in candles:
+            self.upsert(candle)
+
+    def range(self, start: float, end: float) -> Array:
+        """Get a read-only (5 x n) view of the candles with `start <= t < end`."""
+        if not self._size:
+            return numpy.empty((5, 0))
+
+        records = self._records()
+        times = records[:, 0]
+        return records[self._search(times, start) : self._search(times, end)].T
+
+    def flush(self) -> None:
+        """Make the appended records durable."""
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._map = None
+        self._file.close()
+
+    def _write(self, i: int, candle: Candle) -> None:
+        self._file.seek(HEADER.size + i * RECORD.size)
+        self._file.write(RECORD.pack(*candle[1:]))
+
+    def _records(self) -> "numpy.memmap[typing.Any, numpy.dtype[numpy.float64]]":
+        if self._map is None or self._mapped != self._size:
+            # Views handed out earlier keep their own reference to the old mapping.
+            self._map = numpy.memmap(
+                self.path,
+                dtype=numpy.float64,
+                mode="r",
+                offset=HEADER.size,
+                shape=(self._size, 5),
+            )
+            self._mapped = self._size
+
+        return self._map
+
+    def _search(self, times: Array, t: float) -> int:
+        block = bisect.bisect_left(self._index, t)
+        lo = max(block - 1, 0) * self.index_stride
+        hi = min(block * self.index_stride, self._size)
+        return lo + int(numpy.searchsorted(times[lo:hi], t, side="left"))
+
+
+class CandleStore:
+    """The candle files of every (asset, timeframe) pair under `root`."""
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        index_stride: int = DEFAULT_INDEX_STRIDE,
+    ) -> None:
+        self.root = pathlib.Path(root)
+        self.index_stride = index_stride
+        self.files: dict[tuple[int, int], CandleFile] = {}
+
+    def get(self, asset_id: int, tf: int) -> CandleFile:
+        key = (asset_id, tf)
+        candle_file = self.files.get(key)
+        if candle_file is None:
+            candle_file = self.files[key] = CandleFile(
+                self.root / f"{asset_id}_{tf}.candles", tf, self.index_stride
+            )
+
+        return candle_file
+
+    def add(self, asset_id: int, candles: typing.Iterable[Candle]) -> None:
+        for candle in candles:
+            self.get(asset_id, candle.tf).upsert(candle)
+
+    def ingest(self, data: dict[str, typing.Any]) -> None:
+        """Store the candles of a decoded `candles` message from the server."""
+        self.add(data["message"]["assetId"], parse_candles(data))
+
+    def range(self, asset_id: int, tf: int, start: float, end: float) -> Array:
+        return self.get(asset_id, tf).range(start, end)
+
+    def flush(self) -> None:
+        for candle_file in self.files.values():
+            candle_file.flush()
+
+    def close(self) -> None:
+        for candle_file in self.files.values():
+            candle_file.close()
+        self.files.clear()
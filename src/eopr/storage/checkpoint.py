@@ -0,0 +1,242 @@
+"""
+eopr.storage.checkpoint
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Periodic snapshots of the per-asset `CrossoverState`s and `CandleBuffers`, so a
+restarted process signals again as soon as it has caught up on the candles it missed
+instead of after `slow + signal` fresh candles:
+
+    snapshot = load("data/strategy.checkpoint")
+    router = AssetRouter(lambda asset_id: CrossoverState())
+    buffers = CandleBuffers()
+    if snapshot is not None:
+        router.states.update(snapshot.states)
+        buffers = snapshot.buffers
+        for asset_id, (start, end) in snapshot.gaps(time.time()).items():
+            snapshot.replay(asset_id, backfill.fetch(asset_id, start, end).result())
+    checkpointer = Checkpointer("data/strategy.checkpoint", router.states, buffers)
+    dispatcher.on("candles", router)
+    dispatcher.on("candles", checkpointer)
+
+`Checkpointer` copies the state on the thread that runs the strategies, between two
+frames, so a snapshot never holds a half-updated asset; the file is written, synced and
+swapped in by a thread of its own. The states ignore candles older than their last
+one, so replaying a backfill that overlaps the snapshot is safe.
+
+A snapshot is a header (magic, format version, values per state, state and buffer
+counts, save time), the asset ids and the values of `CrossoverState.export` as int64
+and float64 arrays, then per buffer its (asset, timeframe, capacity, size) and its
+candles. None is stored as NaN. Snapshots of another format, or torn ones, are
+ignored.
+"""
+
+import math
+import os
+import pathlib
+import struct
+import threading
+import time
+import typing
+
+import numpy
+
+from eopr.core.strategies.macd_rsi_crossover import CrossoverState
+from eopr.storage import atomic_write
+from eopr.utils.candle_buffer import CandleBuffer, CandleBuffers
+from eopr.utils.candle_parser import Candle
+
+MAGIC = b"EOPRCKPT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIIId")
+BUFFER = struct.Struct("<qqII")
+# The values of `CrossoverState.export`, whose layout the state classes own.
+STATE_FIELDS = CrossoverState.STATE_SIZE
+DEFAULT_INTERVAL = 30.0
+
+
+def _value(value: float | None) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _optional(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def state_values(state: CrossoverState) -> list[float]:
+    """The `STATE_FIELDS` values that `restore_state` rebuilds `state` from."""
+    return [_value(value) for value in state.export()]
+
+
+def restore_state(values: typing.Sequence[float]) -> CrossoverState:
+    state = CrossoverState()
+    state.restore([_optional(float(value)) for value in values])
+    return state
+
+
+class Snapshot(typing.NamedTuple):
+    saved_at: float
+    states: dict[int, CrossoverState]
+    buffers: CandleBuffers
+
+    def gaps(self, now: float, timeframe: int = 5) -> dict[int, tuple[int, int]]:
+        """Per asset, the period to backfill: from the start of its last candle,
+        which may have changed after the snapshot, until `now`."""
+        return {
+            asset_id: (int(state.last_time // timeframe * timeframe), int(now))
+            for asset_id, state in self.states.items()
+            if state.last_time is not None
+        }
+
+    def replay(self, asset_id: int, candles: typing.Iterable[Candle]) -> None:
+        """Feed backfilled candles, oldest first, to the asset's state and buffers."""
+        state = self.states.get(asset_id)
+        for candle in candles:
+            self.buffers.get(asset_id, candle.tf).upsert(candle)
+            if state is not None:
+                state.update(candle.t, candle.close)
+
+
+def encode(
+    states: typing.Mapping[int, CrossoverState],
+    buffers: CandleBuffers | None = None,
+    saved_at: float | None = None,
+) -> bytes:
+    saved_at = time.time() if saved_at is None else saved_at
+    buffer_items = list(buffers.buffers.items()) if buffers is not None else []
+    ids = numpy.fromiter(states, numpy.int64, len(states))
+    values = numpy.array(
+        [state_values(state) for state in states.values()], numpy.float64
+    )
+    parts = [
+        HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            STATE_FIELDS,
+            len(ids),
+            len(buffer_items),
+            saved_at,
+        ),
+        ids.tobytes(),
+        values.tobytes(),
+    ]
+    for (asset_id, tf), buffer in buffer_items:
+        parts.append(BUFFER.pack(asset_id, tf, buffer.capacity, len(buffer)))
+        parts.append(numpy.ascontiguousarray(buffer.window()).tobytes())
+
+    return b"".join(parts)
+
+
+def decode(data: bytes) -> Snapshot | None:
+    """Read a snapshot made by `encode`, or None if it is of another format."""
+    if len(data) < HEADER.size:
+        return None
+    magic, format_version, fields, count, buffer_count, saved_at = HEADER.unpack_from(
+        data
+    )
+    if magic != MAGIC or format_version != FORMAT_VERSION or fields != STATE_FIELDS:
+        return None
+
+    offset = HEADER.size
+    ids = numpy.frombuffer(data, numpy.int64, count, offset)
+    offset += ids.nbytes
+    values = numpy.frombuffer(data, numpy.float64, count * fields, offset)
+    offset += values.nbytes
+    states = {
+        int(asset_id): restore_state(row)
+        for asset_id, row in zip(ids, values.reshape(count, fields))
+    }
+
+    buffers = CandleBuffers()
+    for _ in range(buffer_count):
+        asset_id, tf, capacity, size = BUFFER.unpack_from(data, offset)
+        offset += BUFFER.size
+        window = numpy.frombuffer(data, numpy.float64, 5 * size, offset)
+        offset += window.nbytes
+        buffer = buffers.buffers[(asset_id, tf)] = CandleBuffer(capacity)
+        buffer.extend(window.reshape(5, size))
+
+    return Snapshot(saved_at, states, buffers)
+
+
+def load(path: str | os.PathLike[str]) -> Snapshot | None:
+    """Read the snapshot at `path`, or None if there is none usable, e.g. one torn
+    by a crash, so the strategies start cold."""
+    try:
+        data = pathlib.Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
+
+    try:
+        return decode(data)
+    except (ValueError, TypeError, struct.error) as e:
+        print(f"Error: {e}")
+        return None
+
+
+class Checkpointer:
+    """Snapshot `states` and `buffers` every `interval` seconds.
+
+    Register it as a `candles` handler after the handlers that update the states, or
+    call `checkpoint` from the thread that does.
+
+    Args:
+        path (str | os.PathLike[str]): Where snapshots are written.
+        states (Mapping[int, CrossoverState]): The states by asset id, e.g.
+            `AssetRouter.states`.
+        buffers (CandleBuffers | None): The candle buffers to keep as well.
+        interval (float): Seconds between snapshots.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        states: typing.Mapping[int, CrossoverState],
+        buffers: CandleBuffers | None = None,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.states = states
+        self.buffers = buffers
+        self.interval = interval
+        self.saved = 0
+        self._due = time.monotonic() + interval
+        self._pending: bytes | None = None
+        self._stopped = False
+        self._ready = threading.Condition()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def __call__(self, ws: typing.Any, frame: typing.Any) -> None:
+        if time.monotonic() >= self._due:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Copy the state now and hand it to the writer thread, replacing a snapshot
+        still waiting to be written."""
+        self._due = time.monotonic() + self.interval
+        data = encode(self.states, self.buffers)
+        with self._ready:
+            self._pending = data
+            self._ready.notify()
+
+    def close(self) -> None:
+        """Take a last snapshot, write it, and stop the writer thread."""
+        self.checkpoint()
+        with self._ready:
+            self._stopped = True
+            self._ready.notify()
+        self._writer.join()
+
+    def _write(self) -> None:
+        while True:
+            with self._ready:
+                while self._pending is None and not self._stopped:
+                    self._ready.wait()
+                data, self._pending = self._pending, None
+                if data is None:
+                    return
+            try:
+                atomic_write(self.path, data)
+                self.saved += 1
+            except OSError as e:
+                print(f"Error: {e}")
@@ -0,0 +1,254 @@
+"""
+eopr.testing.server
+~~~~~~~~~~~~~~~~~~~
+
+A local stand-in for eo's WebSocket server, for exercising the readers and measuring
+the hot path without the real server.
+
+It answers the `on_open` handshake (`setContext`, both `multipleAction`s,
+`assetHistoryCandles` and `subscribeCandles`) and then streams synthetic `candles`
+frames, shaped like the ones in docs/Messages.md, for every subscribed asset at `rate`
+frames per asset per second. Each frame's `tt` is the wall-clock time it was sent, so
+clients on the same host can measure tick-to-signal latency from it.
+
+    python -m eopr.testing.server --port 8765 --assets 100 --rate 2
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import typing
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+TIMEFRAME = 5
+EXPIRY_STEP = 30
+
+
+class SyntheticAsset:
+    """A random-walk price and the 5-second bar it is forming."""
+
+    __slots__ = ("id", "price", "bar_time", "open", "high", "low")
+
+    def __init__(self, asset_id: int, price: float) -> None:
+        self.id = asset_id
+        self.price = price
+        self.bar_time = 0.0
+        self.open = self.high = self.low = price
+
+    def tick(self, rng: random.Random, now: float) -> dict[str, typing.Any]:
+        self.price += rng.gauss(0, self.price * 1e-5)
+        bar_time = math.floor(now / TIMEFRAME) * TIMEFRAME
+        if bar_time != self.bar_time:
+            self.bar_time = bar_time
+            self.open = self.high = self.low = self.price
+        self.high = max(self.high, self.price)
+        self.low = min(self.low, self.price)
+
+        price = round(self.price, 3)
+        first_expiry = math.floor(now / EXPIRY_STEP) * EXPIRY_STEP
+        return {
+            "action": "candles",
+            "message": {
+                "assetId": self.id,
+                "candles": [
+                    {"tf": 0, "tt": now, "t": now, "v": [price]},
+                    {
+                        "tf": TIMEFRAME,
+                        "tt": now,
+                        "t": bar_time,
+                        "v": [self.open, self.high, self.low, price],
+                    },
+                ],
+                "expTimes": [
+                    [
+                        first_expiry + i * EXPIRY_STEP,
+                        first_expiry + (i + 1) * EXPIRY_STEP,
+                        [[price, 76, 76, 1]],
+                    ]
+                    for i in range(4)
+                ],
+            },
+        }
+
+
+def asset_record(asset_id: int) -> dict[str, typing.Any]:
+    """A catalog entry with the fields of the `assets` response in docs/Assets.md."""
+    return {
+        "asset_group_id": "currencies",
+        "asset_type": 1,
+        "base_id": asset_id,
+        "changes": 0,
+        "closetime": 72000,
+        "corner_asset_multiple": 1,
+        "digits": 3,
+        "expiration_count": 5,
+        "expiration_step": EXPIRY_STEP,
+        "group_id": 4,
+        "hard_asset_multiple": 1,
+        "id": asset_id,
+        "is_active": 1,
+        "isVisible": True,
+        "max_bet": 1000,
+        "max_profit": 89,
+        "max_refund": 20,
+        "min_bet": 1,
+        "min_profit": 75,
+        "mode": "vanilla",
+        "modeId": 2,
+        "name": f"SYN/{asset_id}",
+        "opentime": 0,
+        "order_rank": 0,
+        "otc_asset_id": 0,
+        "profit": 76,
+        "ps": 1,
+        "purchase_time": 30,
+        "symbol": f"SYN{asset_id}",
+        "trader_choise_k": 2,
+    }
+
+
+class StandInServer:
+    """Serve `assets` synthetic assets, with ids 1 to `assets`.
+
+    Args:
+        assets (int): How many assets the server knows.
+        rate (float): `candles` frames per subscribed asset per second.
+        seed (int): Seeds the random walks, for reproducible runs.
+    """
+
+    def __init__(self, assets: int = 10, rate: float = 2, seed: int = 0) -> None:
+        self.rng = random.Random(seed)
+        self.rate = rate
+        self.assets = {
+            asset_id: SyntheticAsset(asset_id, self.rng.uniform(1, 50000))
+            for asset_id in range(1, assets + 1)
+        }
+
+    async def handler(self, ws: ServerConnection) -> None:
+        subscribed: set[int] = set()
+        streaming: asyncio.Task[None] | None = None
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                for response in self.respond(request, subscribed):
+                    await ws.send(json.dumps(response))
+                if streaming is None and request.get("action") in (
+                    "subscribeCandles",
+                    "assetHistoryCandles",
+                ):
+                    streaming = asyncio.create_task(self.stream(ws, subscribed))
+        except ConnectionClosed:
+            pass
+        finally:
+            if streaming is not None:
+                streaming.cancel()
+
+    def respond(
+        self, request: dict[str, typing.Any], subscribed: set[int]
+    ) -> list[dict[str, typing.Any]]:
+        action = request.get("action")
+        ns = request.get("ns")
+        message = request.get("message") or {}
+
+        if action == "multipleAction":
+            actions = [
+                {
+                    "action": sub["action"],
+                    "ns": sub.get("ns"),
+                    "message": self._sub_action(sub),
+                }
+                for sub in message.get("actions", [])
+            ]
+            return [{"action": action, "ns": ns, "message": {"actions": actions}}]
+        if action == "assetHistoryCandles":
+            return [{"action": action, "ns": ns, "message": self._history(message)}]
+        if action == "subscribeCandles":
+            subscribed.update(
+                asset_id
+                for asset_id in message.get("assetsIds", [])
+                if asset_id in self.assets
+            )
+            return [
+                {"action": action, "ns": ns, "message": {"assetsIds": [*subscribed]}}
+            ]
+        if action == "setContext":
+            return [{"action": action, "ns": ns, "message": {"result": "ok"}}]
+
+        return []
+
+    async def stream(self, ws: ServerConnection, subscribed: set[int]) -> None:
+        interval = 1 / self.rate
+        next_tick = time.monotonic()
+        while True:
+            next_tick += interval
+            for asset_id in [*(subscribed or self.assets)]:
+                frame = self.assets[asset_id].tick(self.rng, time.time())
+                await ws.send(json.dumps(frame))
+            await asyncio.sleep(max(next_tick - time.monotonic(), 0))
+
+    def _sub_action(self, sub: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        action = sub.get("action")
+        if action == "assets":
+            return {"assets": [asset_record(asset_id) for asset_id in self.assets]}
+        if action == "tradeHistory":
+            return {
+                "options": [],
+                "options_count": 0,
+                "is_demo": (sub.get("message") or {}).get("is_demo", 1),
+            }
+
+        return {}
+
+    def _history(self, message: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        asset_id = message.get("assetid")
+        asset = self.assets.get(asset_id) if isinstance(asset_id, int) else None
+        if asset is None:
+            return {"assetId": asset_id, "candles": []}
+
+        timeframe = (message.get("timeframes") or [TIMEFRAME])[0]
+        now = time.time()
+        candles: list[dict[str, typing.Any]] = []
+        for start, end in message.get("periods", []):
+            end = min(end, now)
+            price = asset.price
+            for t in range(int(start // timeframe * timeframe), int(end), timeframe):
+                close = price + self.rng.gauss(0, price * 1e-5)
+                candles.append(
+                    {
+                        "tf": timeframe,
+                        "t": t,
+                        "v": [price, max(price, close), min(price, close), close],
+                    }
+                )
+                price = close
+
+        return {"assetId": asset_id, "candles": candles}
+
+
+async def serve_forever(
+    host: str, port: int, assets: int, rate: float, seed: int = 0
+) -> None:
+    server = StandInServer(assets, rate, seed)
+    async with serve(server.handler, host, port, max_size=None):
+        await asyncio.Future()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for eo's server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--assets", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(serve_forever(args.host, args.port, args.assets, args.rate, args.seed))
+
+
+if __name__ == "__main__":
+    main()
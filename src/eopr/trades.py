@@ -0,0 +1,401 @@
+"""
+eopr.trades
+~~~~~~~~~~~
+
+Trade history sync and analytics. `TradeHistorySync` pages through the `tradeHistory`
+of an account (see docs/Trades.md) with up to `max_in_flight` `index_from` requests
+outstanding at once, into a columnar `TradeTable` that is saved between runs. The
+server lists trades newest first, so a later run only fetches as many trades as
+`options_count` grew by. The sync fails if a request cannot be sent, or if no
+response arrives for `response_timeout` seconds while requests are outstanding:
+
+    table = TradeTable.open("data/trades_demo.npz")
+    sync = TradeHistorySync(ws.send, token, table, is_demo=1)
+    dispatcher.on("tradeHistory", sync.on_response)
+    sync.start().result()
+    table.save()
+    stats = by_asset(table)
+
+The analytics work on the columns with NumPy grouping, without a Python loop per trade.
+A trade with `status` 1 is won and 2 is lost; `type` 0 is a call and 1 a put.
+"""
+
+import collections
+import concurrent.futures
+import io
+import itertools
+import json
+import os
+import pathlib
+import threading
+import typing
+
+import numpy
+import numpy.typing
+
+from eopr import errors
+from eopr.ns import TRADE_HISTORY
+from eopr.storage import atomic_write
+from eopr.utils.frame_decoder import Frame
+
+WON = 1
+LOST = 2
+
+# Column name -> dtype, for the fields of docs/Trades.md used by the analytics.
+COLUMNS: dict[str, numpy.typing.DTypeLike] = {
+    "id": numpy.int64,
+    "asset_id": numpy.int32,
+    "type": numpy.int8,
+    "amount": numpy.float64,
+    "strike_time": numpy.float64,
+    "strike_rate": numpy.float64,
+    "exp_time": numpy.float64,
+    "exp_rate": numpy.float64,
+    "profit": numpy.float64,
+    "status": numpy.int8,
+    "result_amount": numpy.float64,
+    "is_demo": numpy.int8,
+    "currency_id": numpy.int16,
+}
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_NS_START = TRADE_HISTORY
+DEFAULT_RESPONSE_TIMEOUT = 30.0
+
+Send = typing.Callable[[str], typing.Any]
+Columns = dict[str, numpy.typing.NDArray[typing.Any]]
+
+
+class TradeTable:
+    """Trades as one NumPy array per column, sorted by `strike_time`, unique by `id`.
+
+    Args:
+        path (str | os.PathLike[str] | None): Where `save` writes the table.
+    """
+
+    def __init__(self, path: str | os.PathLike[str] | None = None) -> None:
+        self.path = pathlib.Path(path) if path is not None else None
+        self.columns: Columns = {
+            name: numpy.empty(0, dtype) for name, dtype in COLUMNS.items()
+        }
+
+    @classmethod
+    def open(cls, path: str | os.PathLike[str]) -> "TradeTable":
+        table = cls(path)
+        if table.path is not None and table.path.exists():
+            with numpy.load(table.path) as saved:
+                table.columns = {
+                    name: saved[name].astype(dtype, copy=False)
+                    for name, dtype in COLUMNS.items()
+                }
+
+        return table
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __getitem__(self, name: str) -> numpy.typing.NDArray[typing.Any]:
+        return self.columns[name]
+
+    def count(self, is_demo: int) -> int:
+        return int((self.columns["is_demo"] == is_demo).sum())
+
+    def add(self, options: typing.Iterable[dict[str, typing.Any]]) -> int:
+        """Merge trades from `tradeHistory` responses, later copies of a trade
+        replacing earlier ones.
+
+        Returns:
+            int: How many trades were new.
+        """
+        rows = list(options)
+        if not rows:
+            return 0
+
+        new: Columns = {
+            name: numpy.array([row.get(name, 0) for row in rows], dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        merged = {
+            name: numpy.concatenate((self.columns[name], new[name])) for name in COLUMNS
+        }
+        # Keep the last copy of every id: unique over the reversed ids.
+        ids = merged["id"][::-1]
+        _, first = numpy.unique(ids, return_index=True)
+        keep = len(ids) - 1 - first
+        keep = keep[numpy.argsort(merged["strike_time"][keep], kind="stable")]
+
+        before = len(self)
+        self.columns = {name: column[keep] for name, column in merged.items()}
+        return len(self) - before
+
+    def save(self) -> None:
+        """Write the table to `path`, atomically replacing the previous one."""
+        if self.path is None:
+            return
+
+        saved = io.BytesIO()
+        numpy.savez(saved, **self.columns)
+        atomic_write(self.path, saved.getvalue())
+
+
+def history_request(
+    token: str, index_from: int, count: int, is_demo: int, ns: int
+) -> dict[str, typing.Any]:
+    return {
+        "action": "tradeHistory",
+        "message": {"index_from": index_from, "count": count, "is_demo": is_demo},
+        "token": token,
+        "ns": ns,
+    }
+
+
+class TradeHistorySync:
+    """Fetch the trades of one account type that `table` does not have yet.
+
+    `on_response` must be registered as the `tradeHistory` handler of the connection's
+    `FrameDispatcher`.
+
+    Args:
+        send (Send): Sends a text frame, e.g. `WebSocketApp.send`.
+        token (str): The session token.
+        table (TradeTable): Where the trades go.
+        is_demo (int): 1 for the demo account, 0 for the real one.
+        page_size (int): Trades per request.
+        max_in_flight (int): How many requests may await a response at once.
+        ns_start (int): The first `ns` given to a request.
+        response_timeout (float): Seconds without a response, while requests are
+            outstanding, before the sync fails.
+    """
+
+    def __init__(
+        self,
+        send: Send,
+        token: str,
+        table: TradeTable,
+        is_demo: int = 1,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_in_flight: int = 8,
+        ns_start: int = DEFAULT_NS_START,
+        response_timeout: float = DEFAULT_RESPONSE_TIMEOUT,
+    ) -> None:
+        self.send = send
+        self.token = token
+        self.table = table
+        self.is_demo = is_demo
+        self.page_size = page_size
+        self.max_in_flight = max_in_flight
+        self.response_timeout = response_timeout
+        self._ns = itertools.count(ns_start)
+        self._lock = threading.Lock()
+        self._queue: collections.deque[int] = collections.deque()
+        self._in_flight: dict[int, int] = {}
+        self._pages: list[list[dict[str, typing.Any]]] = []
+        self._future: concurrent.futures.Future[int] | None = None
+        self._first: int | None = None
+        self._timer: threading.Timer | None = None
+
+    def start(self) -> "concurrent.futures.Future[int]":
+        """Start syncing.
+
+        Returns:
+            Future[int]: Resolves to the number of new trades once they are in the
+                table, or fails if a request cannot be sent or goes unanswered.
+        """
+        future: concurrent.futures.Future[int] = concurrent.futures.Future()
+        with self._lock:
+            self._future = future
+            self._pages = []
+            self._queue.clear()
+            self._in_flight.clear()
+            self._first = next(self._ns)
+            self._in_flight[self._first] = 0
+            message = history_request(
+                self.token, 0, self.page_size, self.is_demo, self._first
+            )
+            self._arm(future)
+
+        self._send(future, [json.dumps(message)])
+        return future
+
+    def on_response(self, ws: typing.Any, frame: Frame) -> None:
+        with self._lock:
+            if frame.ns not in self._in_flight or self._future is None:
+                return
+            self._in_flight.pop(frame.ns)
+            future = self._future
+            try:
+                message = frame.message or {}
+                options = message.get("options", [])
+                self._pages.append(options)
+                if frame.ns == self._first:
+                    self._plan(int(message.get("options_count", len(options))))
+            except Exception as e:
+                self._stop()
+                _fail(future, errors.EoprError(e))
+                return
+            ready = self._take_ready()
+            done = not self._in_flight and not self._queue
+            if done:
+                self._stop()
+            else:
+                self._arm(future)
+
+        self._send(future, ready)
+        if done:
+            try:
+                future.set_result(
+                    self.table.add(option for page in self._pages for option in page)
+                )
+            except concurrent.futures.InvalidStateError:
+                pass
+
+    def _plan(self, total: int) -> None:
+        missing = total - self.table.count(self.is_demo)
+        self._queue.extend(range(self.page_size, missing, self.page_size))
+
+    def _take_ready(self) -> list[str]:
+        ready: list[str] = []
+        while self._queue and len(self._in_flight) < self.max_in_flight:
+            ns = next(self._ns)
+            index_from = self._queue.popleft()
+            self._in_flight[ns] = index_from
+            ready.append(
+                json.dumps(
+                    history_request(
+                        self.token, index_from, self.page_size, self.is_demo, ns
+                    )
+                )
+            )
+
+        return ready
+
+    def _send(
+        self, future: "concurrent.futures.Future[int]", requests: list[str]
+    ) -> None:
+        """Send requests taken by `_take_ready`; if one cannot be sent, the sync of
+        `future` fails, since the table would be missing its page."""
+        for request in requests:
+            try:
+                self.send(request)
+            except Exception as e:
+                with self._lock:
+                    if self._future is not future:
+                        return
+                    self._stop()
+                _fail(future, errors.EoprError(e))
+                return
+
+    def _arm(self, future: "concurrent.futures.Future[int]") -> None:
+        """(Re)start the response timeout of `future`. Called with the lock held."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.response_timeout, self._expire, (future,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _expire(self, future: "concurrent.futures.Future[int]") -> None:
+        with self._lock:
+            if self._future is not future:
+                return
+            pending = sorted(self._in_flight.values())
+            self._stop()
+        _fail(
+            future,
+            errors.EoprError(
+                TimeoutError(f"no tradeHistory response for index_from {pending}")
+            ),
+        )
+
+    def _stop(self) -> None:
+        """Forget the current sync. Called with the lock held."""
+        self._queue.clear()
+        self._in_flight.clear()
+        self._future = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+def _fail(future: "concurrent.futures.Future[int]", error: Exception) -> None:
+    """Fail `future` unless it is already done, e.g. cancelled by its caller."""
+    try:
+        future.set_exception(error)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+class TradeStats(typing.NamedTuple):
+    """Per-group trade statistics, one array entry per group `key`."""
+
+    key: numpy.typing.NDArray[typing.Any]
+    trades: numpy.typing.NDArray[numpy.intp]
+    wins: numpy.typing.NDArray[numpy.intp]
+    losses: numpy.typing.NDArray[numpy.intp]
+    pnl: numpy.typing.NDArray[numpy.float64]
+    win_rate: numpy.typing.NDArray[numpy.float64]
+    expectancy: numpy.typing.NDArray[numpy.float64]
+
+
+def group_stats(
+    table: TradeTable,
+    keys: numpy.typing.NDArray[typing.Any],
+    mask: numpy.typing.NDArray[numpy.bool_] | None = None,
+) -> TradeStats:
+    """Aggregate the trades by `keys`, one key per trade.
+
+    `expectancy` is the payout-adjusted expected return per unit staked,
+    `win_rate * payout - (1 - win_rate)`, where `payout` is the mean `profit` of the
+    group's decided trades as a fraction.
+    """
+    status = table["status"]
+    profit = table["profit"]
+    result = table["result_amount"]
+    if mask is not None:
+        keys, status, profit, result = (
+            keys[mask],
+            status[mask],
+            profit[mask],
+            result[mask],
+        )
+
+    groups, inverse = numpy.unique(keys, return_inverse=True)
+    size = len(groups)
+    won = status == WON
+    decided = won | (status == LOST)
+
+    trades = numpy.bincount(inverse, minlength=size)
+    wins = numpy.bincount(inverse, weights=won, minlength=size).astype(numpy.intp)
+    losses = (
+        numpy.bincount(inverse, weights=decided, minlength=size).astype(numpy.intp)
+        - wins
+    )
+    pnl = numpy.bincount(inverse, weights=result, minlength=size)
+    payout_sum = numpy.bincount(inverse, weights=profit * decided, minlength=size)
+
+    decided_count = wins + losses
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        win_rate = numpy.where(decided_count > 0, wins / decided_count, 0.0)
+        payout = numpy.where(decided_count > 0, payout_sum / decided_count / 100, 0.0)
+    expectancy = numpy.where(decided_count > 0, win_rate * payout - (1 - win_rate), 0.0)
+
+    return TradeStats(groups, trades, wins, losses, pnl, win_rate, expectancy)
+
+
+def summary(
+    table: TradeTable, mask: numpy.typing.NDArray[numpy.bool_] | None = None
+) -> TradeStats:
+    """The statistics of all trades (or those in `mask`) as a single group."""
+    return group_stats(table, numpy.zeros(len(table), numpy.int8), mask)
+
+
+def by_asset(
+    table: TradeTable, mask: numpy.typing.NDArray[numpy.bool_] | None = None
+) -> TradeStats:
+    return group_stats(table, table["asset_id"], mask)
+
+
+def by_hour(
+    table: TradeTable, mask: numpy.typing.NDArray[numpy.bool_] | None = None
+) -> TradeStats:
+    """Statistics by the UTC hour of day of `strike_time`."""
+    hours = (table["strike_time"] // 3600 % 24).astype(numpy.int8)
+    return group_stats(table, hours, mask)
@@ -0,0 +1,80 @@
+"""
+eopr.utils.asset_router
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Per-asset routing of `candles` frames, for readers subscribed to several assets over
+one connection. The router is registered as the dispatcher's `candles` handler and
+looks up each frame's `assetId` in a dict:
+
+    router = AssetRouter(lambda asset_id: MACDState(12, 26, 9))
+    router.on(160, on_btc_candles)
+    dispatcher.on("candles", router)
+"""
+
+import time
+import typing
+
+from eopr import metrics
+from eopr.utils.frame_decoder import CandlesFrame
+
+S = typing.TypeVar("S")
+AssetHandler = typing.Callable[[typing.Any, CandlesFrame, S], typing.Any]
+
+
+class AssetRouter(typing.Generic[S]):
+    """Route `CandlesFrame`s to the handlers and state of their asset.
+
+    Args:
+        state_factory (typing.Callable[[int], S] | None): Creates the state of an
+            asset the first time one of its frames is routed. Handlers get None as
+            the state when no factory is given.
+        default (AssetHandler[S] | None): Called for assets without handlers of their
+            own.
+    """
+
+    def __init__(
+        self,
+        state_factory: typing.Callable[[int], S] | None = None,
+        default: AssetHandler[S] | None = None,
+    ) -> None:
+        self.state_factory = state_factory
+        self.default = default
+        self.handlers: dict[int, list[AssetHandler[S]]] = {}
+        self.states: dict[int, S] = {}
+
+    def on(self, asset_id: int, handler: AssetHandler[S] | None = None) -> typing.Any:
+        """Register `handler` for `asset_id`. Can also be used as a decorator."""
+
+        def register(handler: AssetHandler[S]) -> AssetHandler[S]:
+            self.handlers.setdefault(asset_id, []).append(handler)
+            return handler
+
+        if handler is None:
+            return register
+
+        return register(handler)
+
+    def state(self, asset_id: int) -> S:
+        state = self.states.get(asset_id)
+        if state is None and self.state_factory is not None:
+            state = self.states[asset_id] = self.state_factory(asset_id)
+
+        return typing.cast(S, state)
+
+    def __call__(self, ws: typing.Any, frame: CandlesFrame) -> None:
+        handlers = self.handlers.get(frame.asset_id)
+        if handlers is None:
+            if self.default is None:
+                return
+            handlers = [self.default]
+
+        state = self.state(frame.asset_id)
+        if not metrics.enabled:
+            for handler in handlers:
+                handler(ws, frame, state)
+            return
+
+        started = time.perf_counter()
+        for handler in handlers:
+            handler(ws, frame, state)
+        metrics.observe("strategy", started, asset=frame.asset_id)
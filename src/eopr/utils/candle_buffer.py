@@ -0,0 +1,142 @@
+"""
+eopr.utils.candle_buffer
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+Fixed-capacity, columnar candle storage. Each (asset, timeframe) pair gets one
+`CandleBuffer` that keeps time, open, high, low and close columns in a single NumPy
+array instead of one Python list per candle.
+
+Every row is written twice, at `i` and `i + capacity`, so the most recent `n` candles
+are always contiguous and `window` can hand out views without copying.
+"""
+
+import typing
+
+import numpy
+
+from eopr.core.indicators.vectorized import Array
+from eopr.utils.candle_parser import Candle, parse_candles
+
+TIME, OPEN, HIGH, LOW, CLOSE = range(5)
+DEFAULT_CAPACITY = 1024
+
+
+class CandleBuffer:
+    __slots__ = ("capacity", "_data", "_end", "_size")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        self._data = numpy.zeros((5, 2 * capacity), dtype=numpy.float64)
+        self._end = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> float | None:
+        if not self._size:
+            return None
+
+        return float(self._data[TIME, self._end - 1 + self.capacity])
+
+    def append(
+        self, t: float, open: float, high: float, low: float, close: float
+    ) -> None:
+        """Append a new candle, overwriting the oldest one when the buffer is full."""
+        self._write(self._end, t, open, high, low, close)
+        self._end = (self._end + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, window: Array) -> None:
+        """Append the candles of a (5 x n) block in the layout of `window`, oldest
+        first."""
+        window = window[:, -self.capacity :]
+        n = window.shape[1]
+        columns = (self._end + numpy.arange(n)) % self.capacity
+        self._data[:, columns] = window
+        self._data[:, columns + self.capacity] = window
+        self._end = (self._end + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def update_last(
+        self, t: float, open: float, high: float, low: float, close: float
+    ) -> None:
+        """Overwrite the most recent candle in place (e.g. a still-forming candle)."""
+        if not self._size:
+            raise IndexError("update_last on an empty CandleBuffer")
+
+        self._write((self._end - 1) % self.capacity, t, open, high, low, close)
+
+    def upsert(self, candle: Candle) -> bool:
+        """Append `candle`, or update the last candle if it has the same start time.
+
+        Candles older than the last one are ignored.
+
+        Returns:
+            bool: True if a new candle was appended, False otherwise.
+        """
+        last_time = self.last_time
+        if last_time is not None and candle.t <= last_time:
+            if candle.t == last_time:
+                self.update_last(*candle[1:])
+            return False
+
+        self.append(*candle[1:])
+        return True
+
+    def window(self, n: int | None = None) -> Array:
+        """Get a (5 x n) read-only view of the `n` most recent candles.
+
+        The rows are time, open, high, low and close, so `window(n).T` has the same
+        layout as `list[CandlePrice]` and `window(n)[CLOSE]` is the close series that
+        `eopr.core.indicators.vectorized` takes.
+        """
+        n = self._size if n is None else min(n, self._size)
+        stop = self._end + self.capacity
+        view = self._data[:, stop - n : stop]
+        view.flags.writeable = False
+
+        return view
+
+    def times(self, n: int | None = None) -> Array:
+        return self.window(n)[TIME]
+
+    def closes(self, n: int | None = None) -> Array:
+        return self.window(n)[CLOSE]
+
+    def _write(
+        self, i: int, t: float, open: float, high: float, low: float, close: float
+    ) -> None:
+        row = (t, open, high, low, close)
+        self._data[:, i] = row
+        self._data[:, i + self.capacity] = row
+
+
+class CandleBuffers:
+    """The candle buffers of every (asset, timeframe) pair seen so far."""
+
+    __slots__ = ("capacity", "buffers")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self.buffers: dict[tuple[int, int], CandleBuffer] = {}
+
+    def get(self, asset_id: int, tf: int) -> CandleBuffer:
+        key = (asset_id, tf)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = CandleBuffer(self.capacity)
+
+        return buffer
+
+    def add(self, asset_id: int, candles: typing.Iterable[Candle]) -> None:
+        for candle in candles:
+            self.get(asset_id, candle.tf).upsert(candle)
+
+    def ingest(self, data: dict[str, typing.Any]) -> None:
+        """Store the candles of a decoded `candles` message from the server."""
+        self.add(data["message"]["assetId"], parse_candles(data))
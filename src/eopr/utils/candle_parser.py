@@ -1,10 +1,21 @@
 import typing
 
+from eopr import errors
+
 T = typing.TypeVar("T")
 CandleData = dict[str, list[T]]
 Price = float | int
 
 
+class Candle(typing.NamedTuple):
+    tf: int
+    t: float
+    open: float
+    high: float
+    low: float
+    close: float
+
+
 def parse_candles_data(data: dict[str, typing.Any]) -> list[float]:
     """The data is in the following format as of 2023-01-07:
     {"action":"candles","message":{"assetId":160,"candles":[{"tf":0,"tt":1688179038.5,"t":1688179038.5,"v":[30468.708]},{"tf":5,"tt":1688179038.5,"t":1688179035,"v":[30468.757,30468.757,30468.619,30468.708]}],"expTimes":[[1688179020,1688179050,[[30468.708,76,76,1],[30468.0986,77,2,2],[30469.3174,6,76,3]]],[1688179050,1688179080,[[30468.708,76,76,1],[30468.0986,76,5,2],[30469.3174,6,76,3]]],[1688179080,1688179110,[[30468.708,76,76,1],[30468.0986,76,6,2],[30469.3174,6,76,3]]],[1688179110,1688179140,[[30468.708,76,76,1],[30468.0986,76,6,2],[30469.3174,8,76,3]]]]}}
@@ -24,3 +35,43 @@ def parse_candles_data(data: dict[str, typing.Any]) -> list[float]:
         candles.extend(values)
 
     return candles
+
+
+def parse_candles(data: dict[str, typing.Any]) -> list[Candle]:
+    """Like `parse_candles_data`, but keeps each candle's timeframe and start time.
+
+    Ticks (`tf` 0) carry a single price in `v`, which is used for all of open, high,
+    low and close.
+
+    Args:
+        data (dict[str, typing.Any]): The `candles` message from the server.
+
+    Returns:
+        list[Candle]: The parsed candles, in the order the server sent them.
+
+    Raises:
+        EoprError: If a candle has neither a single price nor all four of open, high,
+            low and close.
+    """
+    candles_data: list[dict[str, typing.Any]] = data.get("message", {}).get(
+        "candles", []
+    )
+    candles: list[Candle] = []
+
+    for candle in candles_data:
+        values = candle.get("v", [])
+        if not values:
+            continue
+        if len(values) == 1:
+            price = values[0]
+            candles.append(
+                Candle(candle["tf"], candle["t"], price, price, price, price)
+            )
+        elif len(values) >= 4:
+            candles.append(Candle(candle["tf"], candle["t"], *values[:4]))
+        else:
+            raise errors.EoprError(
+                ValueError(f"malformed candle, expected 1 or 4 values: {candle}")
+            )
+
+    return candles
@@ -0,0 +1,263 @@
+"""
+eopr.utils.frame_decoder
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+Decoding and per-action routing of the frames received from the server.
+
+The action name is read straight from the raw frame before anything is parsed, so
+frames without a registered handler are dropped without a `json.loads`; frames that do
+not start with their `action` are parsed once, and the parsed frame is reused. `candles`
+frames are decoded into `CandlesFrame` and, unless a handler asked for them, the
+`expTimes` payout arrays are cut off before parsing.
+
+A `FrameDispatcher` has the same signature as a strategy handler, so it can be passed
+directly as `ReaderParams.on_message_strategy`:
+
+    dispatcher = FrameDispatcher()
+
+    @dispatcher.on("candles")
+    def on_candles(ws, frame: CandlesFrame) -> None:
+        ...
+
+    read(ReaderParams(..., on_message_strategy=dispatcher))
+"""
+
+import json
+import re
+import time
+import typing
+
+from eopr import metrics
+from eopr.utils.candle_parser import Candle, parse_candles
+
+RawFrame = bytes | str
+Handler = typing.Callable[[typing.Any, typing.Any], typing.Any]
+# Decoders get the action's own dict and the frame it arrived in, which differ only for
+# the sub-actions of a `multipleAction` frame.
+Decoder = typing.Callable[[dict[str, typing.Any], dict[str, typing.Any]], typing.Any]
+
+# Tolerates the whitespace `json.dumps` puts after separators by default.
+_ACTION = re.compile(r'\s*\{\s*"action"\s*:\s*"([^"\\]*)"')
+_EXP_TIMES_KEY = '"expTimes"'
+_ASSET_ID_KEY = '"assetId":'
+_TIME_KEY = '"t":'
+
+
+class Frame(typing.NamedTuple):
+    action: str
+    ns: int | None
+    message: typing.Any
+
+
+class CandlesFrame(typing.NamedTuple):
+    asset_id: int
+    candles: list[Candle]
+    exp_times: list[typing.Any] | None
+
+
+def read_action(frame: RawFrame, parse: bool = True) -> str | None:
+    """Get the `action` of a raw frame, parsing it only if it is not the first key.
+
+    Args:
+        frame (RawFrame): The raw frame.
+        parse (bool): Whether to parse frames that do not start with their `action`,
+            instead of returning None for them.
+    """
+    text = frame.decode() if isinstance(frame, bytes) else frame
+    if not parse:
+        match = _ACTION.match(text)
+        return match.group(1) if match is not None else None
+
+    return _read_action(text)[0]
+
+
+def _read_action(text: str) -> tuple[str | None, dict[str, typing.Any] | None]:
+    """The `action` of a frame, and the parsed frame if it had to be parsed for it."""
+    match = _ACTION.match(text)
+    if match is not None:
+        return match.group(1), None
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+
+    return data.get("action"), data
+
+
+def read_asset_id(frame: RawFrame) -> int | None:
+    """Get the first `assetId` of a raw frame without parsing it."""
+    text = frame.decode() if isinstance(frame, bytes) else frame
+    start = text.find(_ASSET_ID_KEY)
+    if start == -1:
+        return None
+
+    start += len(_ASSET_ID_KEY)
+    end = start
+    while end < len(text) and text[end] in " -0123456789":
+        end += 1
+    try:
+        return int(text[start:end])
+    except ValueError:
+        return None
+
+
+def read_candle_time(frame: RawFrame) -> float | None:
+    """Get the first candle `t` of a raw `candles` frame without parsing it; the
+    server sends the `tf` 0 tick, the latest, first."""
+    text = frame.decode() if isinstance(frame, bytes) else frame
+    start = text.find(_TIME_KEY)
+    if start == -1:
+        return None
+
+    start += len(_TIME_KEY)
+    end = start
+    while end < len(text) and text[end] in " -+.0123456789eE":
+        end += 1
+    try:
+        return float(text[start:end])
+    except ValueError:
+        return None
+
+
+def decode_frame(data: dict[str, typing.Any], frame: dict[str, typing.Any]) -> Frame:
+    return Frame(data.get("action", ""), data.get("ns"), data.get("message"))
+
+
+def decode_candles(
+    data: dict[str, typing.Any], frame: dict[str, typing.Any]
+) -> CandlesFrame:
+    message = data["message"]
+    return CandlesFrame(
+        message["assetId"], parse_candles(data), message.get("expTimes")
+    )
+
+
+def _exp_times_start(text: str) -> int:
+    """Where the `, "expTimes": ...` member of a frame starts, or -1."""
+    key = text.find(_EXP_TIMES_KEY)
+    if key == -1:
+        return -1
+
+    start = len(text[:key].rstrip())
+    return start - 1 if text[start - 1] == "," else -1
+
+
+def _loads_candles(text: str, exp_times: bool) -> dict[str, typing.Any]:
+    if not exp_times:
+        cut = _exp_times_start(text)
+        if cut != -1:
+            try:
+                data = json.loads(text[:cut] + "}}")
+            except ValueError:
+                data = None
+            if data is not None and "candles" in data.get("message", {}):
+                return data
+
+    return json.loads(text)
+
+
+class FrameDispatcher:
+    """Route incoming frames to the handlers registered for their action.
+
+    The sub-actions of a `multipleAction` response (e.g. `assets`, `tradeHistory`)
+    are routed to their own handlers as well, after the `multipleAction` handlers.
+
+    Args:
+        fallback (Handler | None): Called with the raw frame for actions that have no
+            registered handler.
+    """
+
+    def __init__(self, fallback: Handler | None = None) -> None:
+        self.fallback = fallback
+        self.handlers: dict[str, list[Handler]] = {}
+        self.decoders: dict[str, Decoder] = {"candles": decode_candles}
+        self.exp_times = False
+
+    def on(
+        self, action: str, handler: Handler | None = None, *, exp_times: bool = False
+    ) -> typing.Any:
+        """Register `handler` for `action`. Can also be used as a decorator.
+
+        Args:
+            action (str): The action name, e.g. "candles" or "tradeHistory".
+            handler (Handler | None): Called with the websocket and decoded frame.
+            exp_times (bool): Whether the handler needs `CandlesFrame.exp_times`.
+        """
+
+        def register(handler: Handler) -> Handler:
+            self.handlers.setdefault(action, []).append(handler)
+            self.exp_times = self.exp_times or exp_times
+            return handler
+
+        if handler is None:
+            return register
+
+        return register(handler)
+
+    def __call__(self, ws: typing.Any, message: RawFrame) -> None:
+        self.dispatch(ws, message)
+
+    def dispatch(self, ws: typing.Any, message: RawFrame) -> None:
+        measured = metrics.enabled
+        started = time.perf_counter() if measured else 0.0
+        text = message.decode() if isinstance(message, bytes) else message
+        action, data = _read_action(text)
+        if action == "multipleAction":
+            self._dispatch_multiple(ws, message, text, data)
+            return
+
+        handlers = self.handlers.get(action) if action else None
+        if not handlers:
+            if self.fallback is not None:
+                self.fallback(ws, message)
+            return
+
+        if data is None:
+            if action == "candles":
+                data = _loads_candles(text, self.exp_times)
+            else:
+                data = json.loads(text)
+
+        decoded = self.decoders.get(action, decode_frame)(data, data)
+        if not measured:
+            for handler in handlers:
+                handler(ws, decoded)
+            return
+
+        metrics.observe("decode", started, action)
+        started = time.perf_counter()
+        for handler in handlers:
+            handler(ws, decoded)
+        metrics.observe("handler", started, action)
+
+    def _dispatch_multiple(
+        self,
+        ws: typing.Any,
+        message: RawFrame,
+        text: str,
+        data: dict[str, typing.Any] | None,
+    ) -> None:
+        if data is None:
+            data = json.loads(text)
+        actions = (data.get("message") or {}).get("actions", [])
+        if "multipleAction" not in self.handlers and not any(
+            action.get("action") in self.handlers for action in actions
+        ):
+            if self.fallback is not None:
+                self.fallback(ws, message)
+            return
+
+        for handler in self.handlers.get("multipleAction", []):
+            handler(ws, decode_frame(data, data))
+
+        for action in actions:
+            name = action.get("action")
+            handlers = self.handlers.get(name)
+            if not handlers:
+                continue
+            decoded = self.decoders.get(name, decode_frame)(action, data)
+            for handler in handlers:
+                handler(ws, decoded)
@@ -0,0 +1,143 @@
+"""
+eopr.utils.resampler
+~~~~~~~~~~~~~~~~~~~~
+
+Incremental OHLC bars for any set of timeframes, built from the `tf` 0 ticks that
+every `candles` frame carries. Strategies can use any timeframe this way without
+extra server subscriptions or re-aggregating history:
+
+    resampler = Resampler([5, 15, 60, 300])
+    resampler.on(60, lambda asset_id, candle, closed: ...)
+    dispatcher.on("candles", resampler)
+
+Bars start on multiples of their timeframe, like the server's `tf` 5 candles, and
+close when the first tick of a later bar arrives or when `flush` is called past
+their end. Ticks of any asset advance the clock, and every time it enters a new bar of
+the shortest timeframe the bars of every asset that have ended are flushed, so an
+illiquid asset still gets its last bar closed.
+"""
+
+import math
+import typing
+
+from eopr.utils.candle_parser import Candle
+from eopr.utils.frame_decoder import CandlesFrame
+
+BarHandler = typing.Callable[[int, Candle, bool], typing.Any]
+
+
+class AssetBars:
+    """The forming bar of every timeframe for one asset."""
+
+    __slots__ = ("timeframes", "bars", "closed")
+
+    def __init__(self, timeframes: typing.Iterable[int]) -> None:
+        self.timeframes = sorted(set(timeframes))
+        # [start, open, high, low, close] per timeframe, updated in place.
+        self.bars: dict[int, list[float] | None] = dict.fromkeys(self.timeframes)
+        # The start of the last closed bar per timeframe, which ticks must be past.
+        self.closed: dict[int, float] = {}
+
+    def update(self, t: float, price: float) -> list[tuple[Candle, bool]]:
+        """Fold a tick into every timeframe's bar.
+
+        Returns:
+            list[tuple[Candle, bool]]: For each timeframe, the bar the tick closed
+                (flagged True), if any, followed by the bar it now forms (False).
+                Ticks older than a timeframe's forming bar, or within a bar already
+                closed, leave it untouched.
+        """
+        changes: list[tuple[Candle, bool]] = []
+        for tf in self.timeframes:
+            start = t // tf * tf
+            bar = self.bars[tf]
+            if bar is None or start > bar[0]:
+                if bar is not None:
+                    changes.append((Candle(tf, *bar), True))
+                    self.closed[tf] = bar[0]
+                elif start <= self.closed.get(tf, -math.inf):
+                    continue
+                bar = self.bars[tf] = [start, price, price, price, price]
+            elif start < bar[0]:
+                continue
+            else:
+                if price > bar[2]:
+                    bar[2] = price
+                if price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+            changes.append((Candle(tf, *bar), False))
+
+        return changes
+
+    def flush(self, now: float) -> list[Candle]:
+        """Close every bar that ended at or before `now`."""
+        closed: list[Candle] = []
+        for tf in self.timeframes:
+            bar = self.bars[tf]
+            if bar is not None and bar[0] + tf <= now:
+                closed.append(Candle(tf, *bar))
+                self.closed[tf] = bar[0]
+                self.bars[tf] = None
+
+        return closed
+
+    def forming(self, tf: int) -> Candle | None:
+        bar = self.bars.get(tf)
+        return Candle(tf, *bar) if bar is not None else None
+
+
+class Resampler:
+    """Resample the ticks of every asset and hand the bars to per-timeframe handlers.
+
+    Handlers get the asset id, the bar and whether it has closed. A handler sees every
+    update of the forming bar and then the closed bar once.
+    """
+
+    def __init__(self, timeframes: typing.Iterable[int]) -> None:
+        self.timeframes = sorted(set(timeframes))
+        self.assets: dict[int, AssetBars] = {}
+        self.handlers: dict[int, list[BarHandler]] = {}
+        # `flush` runs once per bar of the shortest timeframe, the last in `_flushed`.
+        self._step = self.timeframes[0] if self.timeframes else math.inf
+        self._flushed = -math.inf
+
+    def on(self, tf: int, handler: BarHandler | None = None) -> typing.Any:
+        """Register `handler` for bars of `tf` seconds. Can be used as a decorator."""
+        if tf not in self.timeframes:
+            raise ValueError(f"{tf} is not one of the timeframes {self.timeframes}")
+
+        def register(handler: BarHandler) -> BarHandler:
+            self.handlers.setdefault(tf, []).append(handler)
+            return handler
+
+        if handler is None:
+            return register
+
+        return register(handler)
+
+    def update(self, asset_id: int, t: float, price: float) -> None:
+        bar = t // self._step * self._step
+        if bar > self._flushed:
+            self._flushed = bar
+            self.flush(t)
+
+        bars = self.assets.get(asset_id)
+        if bars is None:
+            bars = self.assets[asset_id] = AssetBars(self.timeframes)
+
+        for candle, closed in bars.update(t, price):
+            for handler in self.handlers.get(candle.tf, ()):
+                handler(asset_id, candle, closed)
+
+    def flush(self, now: float) -> None:
+        """Close the bars of every asset that ended at or before `now`."""
+        for asset_id, bars in self.assets.items():
+            for candle in bars.flush(now):
+                for handler in self.handlers.get(candle.tf, ()):
+                    handler(asset_id, candle, True)
+
+    def __call__(self, ws: typing.Any, frame: CandlesFrame) -> None:
+        for candle in frame.candles:
+            if candle.tf == 0:
+                self.update(frame.asset_id, candle.t, candle.close)